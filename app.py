@@ -4,9 +4,12 @@ Streamlit app
 """
 
 import streamlit as st
-import pandas as pd
-import altair as alt
-import plotly.express as px
+
+from chart_data import career_chart_specs
+from dashboard_aggregates import dataset_path, load_aggregates, read_head_to_head
+from scripts.hashing import file_hash
+from match_store import MatchStore
+from thumbnails import build_thumbnails, image_paths, pick_image
 
 
 # page configurations
@@ -14,32 +17,58 @@ st.set_page_config(page_title="MSSDVB", layout="wide")
 
 st.html("<style>hr {border-color: white;}</style>")
 
-def season_card(season):
-    st.subheader(f"{season['season'].iloc[0]} season")
+def season_card(card):
+    wins, losses, ties = card['record']
+    st.subheader(f"{card['season']} season")
     st.markdown(f"""
-    **Matches:** {len(season)}  
-    **Record:** {season['result'].eq('W').sum()} -
-                    {season['result'].eq('L').sum()} -
-                    {season['result'].eq('T').sum()}  
-    **Total Kills:** {int(season['kills'].sum())}  
-    **Total Aces:** {int(season['aces'].sum())}  
-    **Total Digs:** {int(season['digs'].sum())}  
-    **Total Blocks:** {int(season['total_blocks'].sum())}  
+    **Matches:** {card['matches']}  
+    **Record:** {wins} -
+                    {losses} -
+                    {ties}  
+    **Total Kills:** {card['totals']['kills']}  
+    **Total Aces:** {card['totals']['aces']}  
+    **Total Digs:** {card['totals']['digs']}  
+    **Total Blocks:** {card['totals']['total_blocks']}  
     """)
 
 
 # data
+# every loader is keyed by the dataset's hash, so a new pipeline run invalidates them and reruns are lookups
+# (prefers the typed Feather copy written by the pipeline: memory-mapped, no CSV parsing or dtype inference)
+# the store is a shared resource: its indexes are built once per process, not copied per rerun
+@st.cache_resource
+def load_store(path, version):
+    return MatchStore.load(path)
+
+@st.cache_data
+def load_summary(path, version):
+    return load_aggregates(path)
+
+@st.cache_data
+def load_chart_specs(path, version):
+    return career_chart_specs(load_store(path, version).df)
+
 @st.cache_data
-def load_data():
-    df = pd.read_csv("data/NEW_enriched_matches.csv")
-    df["date"] = pd.to_datetime(df["date"]).dt.date
-    return df
+def load_head_to_head(version, season=None):
+    return read_head_to_head(season)
+
+data_path = dataset_path()
+data_version = file_hash(data_path)
+store = load_store(data_path, data_version)
+summary = load_summary(data_path, data_version)
+cards = summary["seasons"]
+metrics = summary["metrics"]
+chart_specs = load_chart_specs(data_path, data_version)
+
+# images: serve resized WebP copies (built once per process, reused across processes via the hash-keyed cache dir)
+HEADER_WIDTH = 640
+GALLERY_WIDTH = 960
 
-df = load_data()
-fr = df[df["season"] == "FR"]
-so = df[df["season"] == "SO"]
-jr = df[df["season"] == "JR"]
-sr = df[df["season"] == "SR"]
+@st.cache_resource
+def load_thumbnails():
+    return build_thumbnails(image_paths())
+
+thumbs = load_thumbnails()
 
 
 # header
@@ -51,19 +80,19 @@ col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     st.markdown("<h2 style='text-align: center;'>2016</h2>", unsafe_allow_html=True)
-    st.image("images/2016.jpg", "SpikeOut XVIII @ Indiana")
+    st.image(pick_image(thumbs, "images/2016.jpg", HEADER_WIDTH), "SpikeOut XVIII @ Indiana")
 
 with col2:
     st.markdown("<h2 style='text-align: center;'>2017</h2>", unsafe_allow_html=True)
-    st.image("images/2017.JPG", "SpikeOut XIX @ Maryland")
+    st.image(pick_image(thumbs, "images/2017.JPG", HEADER_WIDTH), "SpikeOut XIX @ Maryland")
 
 with col3:
     st.markdown("<h2 style='text-align: center;'>2018</h2>", unsafe_allow_html=True)
-    st.image("images/2018.JPG", "SpikeOut XX @ Model Secondary")
+    st.image(pick_image(thumbs, "images/2018.JPG", HEADER_WIDTH), "SpikeOut XX @ Model Secondary")
 
 with col4:
     st.markdown("<h2 style='text-align: center;'>2019</h2>", unsafe_allow_html=True)
-    st.image("images/2019.JPG", "SpikeOut XXI @ Riverside")
+    st.image(pick_image(thumbs, "images/2019.JPG", HEADER_WIDTH), "SpikeOut XXI @ Riverside")
 
 
 st.divider()
@@ -71,102 +100,48 @@ st.divider()
 
 # at a glance section
 st.markdown("<h2 style='text-align: center;'>At a Glance: 2016-2019</h2>", unsafe_allow_html=True)
-df_nojr = df[df['career_stage'].notna() & (df['season'] != 'JR')]
-year_colors = {
-    'early': "#0c6cb1",
-    'mid': "#ffffff",
-    'late': "#e83717"
-}
 
 # k/s
 st.subheader("Kills Per Set")
 col9, col10, col11 = st.columns(3)
 with col9:
-    st.metric("Average Kills/Set", round(df_nojr["kills_per_set"].mean(), 2))
+    st.metric("Average Kills/Set", round(metrics["kills_per_set"]["mean"], 2))
 
 with col10:
-    st.metric("Highest Kills/Set", df_nojr["kills_per_set"].max())
+    st.metric("Highest Kills/Set", metrics["kills_per_set"]["max"])
 
 with col11:
-    st.metric("Most Consistent Stretch", round(df_nojr["kills_per_set"].rolling(5).std().min(), 2))
-
-chart = (
-    alt.Chart(df_nojr)
-    .mark_line(point=True)
-    .encode(
-        x=alt.X('career_match_index:Q', title='Career Match Index'),
-        y=alt.Y('kills_per_set:Q', title='Kills Per Set'),
-        color=alt.Color(
-            'career_stage:N',
-            scale=alt.Scale(domain=list(year_colors.keys()), range=list(year_colors.values())),
-            title='Year'
-        ),
-        tooltip=['opponent', 'career_match_index', 'kills_per_set']
-    )
-    .properties(width=700, height=400)
-)
+    st.metric("Most Consistent Stretch", round(metrics["kills_per_set"]["consistency"], 2))
 
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(chart_specs["kills_per_set"], use_container_width=True)
 
 # d/s
 st.subheader("Digs Per Set")
 col9, col10, col11 = st.columns(3)
 with col9:
-    st.metric("Average Digs/Set", round(df_nojr["digs_per_set"].mean(), 2))
+    st.metric("Average Digs/Set", round(metrics["digs_per_set"]["mean"], 2))
 
 with col10:
-    st.metric("Highest Digs/Set", df_nojr["digs_per_set"].max())
+    st.metric("Highest Digs/Set", metrics["digs_per_set"]["max"])
 
 with col11:
-    st.metric("Most Consistent Stretch", round(df_nojr["digs_per_set"].rolling(5).std().min(), 2))
-
-chart = (
-    alt.Chart(df_nojr)
-    .mark_line(point=True)
-    .encode(
-        x=alt.X('career_match_index:Q', title='Career Match Index'),
-        y=alt.Y('digs_per_set:Q', title='Digs Per Set'),
-        color=alt.Color(
-            'career_stage:N',
-            scale=alt.Scale(domain=list(year_colors.keys()), range=list(year_colors.values())),
-            title='Year'
-        ),
-        tooltip=['opponent', 'career_match_index', 'digs_per_set']
-    )
-    .properties(width=700, height=400)
-)
+    st.metric("Most Consistent Stretch", round(metrics["digs_per_set"]["consistency"], 2))
 
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(chart_specs["digs_per_set"], use_container_width=True)
 
 # a/s
 st.subheader("Aces Per Set")
 col9, col10, col11 = st.columns(3)
 with col9:
-    st.metric("Average Aces/Set", round(df_nojr["aces_per_set"].mean(), 2))
+    st.metric("Average Aces/Set", round(metrics["aces_per_set"]["mean"], 2))
 
 with col10:
-    st.metric("Highest Aces/Set", df_nojr["aces_per_set"].max())
+    st.metric("Highest Aces/Set", metrics["aces_per_set"]["max"])
 
 with col11:
-    st.metric("Most Consistent Stretch", round(df_nojr["aces_per_set"].rolling(5).std().min(), 2))
-
-chart = (
-    alt.Chart(df_nojr)
-    .mark_line(point=True)
-    .encode(
-        x=alt.X('career_match_index:Q', title='Career Match Index'),
-        y=alt.Y('aces_per_set:Q', title='Aces Per Set'),
-        color=alt.Color(
-            'career_stage:N',
-            scale=alt.Scale(domain=list(year_colors.keys()), range=list(year_colors.values())),
-            title='Year'
-        ),
-        tooltip=['opponent', 'career_match_index', 'aces_per_set']
-    )
-    .properties(width=700, height=400)
-)
+    st.metric("Most Consistent Stretch", round(metrics["aces_per_set"]["consistency"], 2))
 
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(chart_specs["aces_per_set"], use_container_width=True)
 
 
 st.divider()
@@ -187,26 +162,29 @@ st.markdown("<h2 style='text-align: center;'>2016-2019: 4-Year Overview</h2>", u
 col5, col6, col7, col8 = st.columns(4)
 
 with col5:
-    season_card(fr)
+    season_card(cards["FR"])
 
 with col6:
-    season_card(so)
+    season_card(cards["SO"])
 
 with col7:
-    st.subheader(f"{jr['season'].iloc[0]} season")
-    st.markdown(f"""
-    **Matches:** {len(jr)}  
-    **Record:** {jr['result'].eq('W').sum()} -
-                    {jr['result'].eq('L').sum()} -
-                    {jr['result'].eq('T').sum()}  
-    **Total Kills:** {167}  
-    **Total Aces:** {120}  
-    **Total Digs:** {250}  
-    **Total Blocks:** {8}  
-    """)
+    season_card(cards["JR"])  # totals from the JR season summary sheet
 
 with col8:
-    season_card(sr)
+    season_card(cards["SR"])
+
+# head-to-head: read straight from the pipeline's opponent x season table
+HEAD_TO_HEAD_COLUMNS = [
+    "opponent", "games_played", "wins", "losses", "ties", "win_rate", "avg_set_diff",
+    "points_for", "points_against", "kills_per_set", "hit_pct", "aces_per_set", "digs_per_set",
+]
+h2h_season = st.selectbox("Head-to-head", ["Career", "FR", "SO", "JR", "SR"])
+head_to_head = load_head_to_head(data_version, None if h2h_season == "Career" else h2h_season)
+if head_to_head is not None:
+    st.dataframe(
+        head_to_head[HEAD_TO_HEAD_COLUMNS].sort_values("games_played", ascending=False, kind="mergesort"),
+        hide_index=True, use_container_width=True,
+    )
 
 
 st.divider()
@@ -262,8 +240,9 @@ items = [
     ("images/pvacrunners.jpg", "2017 PVAC Runner-Ups")
 ]
 
+full_size = st.toggle("Show full-size photos")  # originals only load when asked for
 cols = st.columns(3)
 
 for i, (img_path, caption) in enumerate(items):
     with cols[i % 3]:
-        st.image(img_path, caption=caption, use_container_width=True)
+        st.image(img_path if full_size else pick_image(thumbs, img_path, GALLERY_WIDTH), caption=caption, use_container_width=True)
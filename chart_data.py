@@ -0,0 +1,56 @@
+"""
+Slim chart payloads for the Streamlit app
+@created October 2026
+"""
+
+import altair as alt
+
+STAGE_COLORS = {
+    'early': "#0c6cb1",
+    'mid': "#ffffff",
+    'late': "#e83717"
+}
+
+# stat column -> axis title for the at-a-glance career charts
+CAREER_CHARTS = {
+    "kills_per_set": "Kills Per Set",
+    "digs_per_set": "Digs Per Set",
+    "aces_per_set": "Aces Per Set",
+}
+BASE_COLUMNS = ["career_match_index", "career_stage", "opponent"]
+
+def career_chart_frame(df):
+    # JR has no stats and unstaged rows aren't charted; keep only what the charts encode or show in tooltips
+    nojr = df[df["career_stage"].notna() & (df["season"].astype(str) != "JR")]
+    frame = nojr[BASE_COLUMNS + list(CAREER_CHARTS)].reset_index(drop=True)
+    frame["career_stage"] = frame["career_stage"].astype(str)
+    frame["opponent"] = frame["opponent"].astype(str)
+    return frame
+
+def career_chart(frame, stat):
+    title = CAREER_CHARTS[stat]
+    return (
+        alt.Chart(frame[BASE_COLUMNS + [stat]])
+        .mark_line(point=True)
+        .encode(
+            x=alt.X('career_match_index:Q', title='Career Match Index'),
+            y=alt.Y(f'{stat}:Q', title=title),
+            color=alt.Color(
+                'career_stage:N',
+                scale=alt.Scale(domain=list(STAGE_COLORS.keys()), range=list(STAGE_COLORS.values())),
+                title='Year'
+            ),
+            tooltip=['opponent', 'career_match_index', stat]
+        )
+        .properties(width=700, height=400)
+    )
+
+def career_chart_specs(df):
+    """
+    Compiled Vega-Lite specs for every career chart, built from one shared
+    projected frame. Each spec inlines only the four columns its chart uses
+    (~100 columns before), so a spec is a few KB and can be cached per
+    dataset version and handed straight to st.vega_lite_chart.
+    """
+    frame = career_chart_frame(df)
+    return {stat: career_chart(frame, stat).to_dict() for stat in CAREER_CHARTS}
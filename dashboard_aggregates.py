@@ -0,0 +1,109 @@
+"""
+Precomputed aggregates for the Streamlit app
+@created October 2026
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from scripts.hashing import file_hash
+from scripts.jr_totals import JR_TOTALS_PATH, load_jr_totals
+
+DATA_PATH = "data/NEW_enriched_matches.csv"
+TYPED_DATA_PATH = "data/NEW_enriched_matches.feather"
+HEAD_TO_HEAD_PATH = "data/NEW_opponent_head_to_head.csv"
+TYPED_HEAD_TO_HEAD_PATH = "data/NEW_opponent_head_to_head.feather"
+CACHE_DIR = "data/.cache/aggregates"
+
+SEASONS = ["FR", "SO", "JR", "SR"]
+CARD_STATS = ["kills", "aces", "digs", "total_blocks"]
+METRIC_STATS = ["kills_per_set", "digs_per_set", "aces_per_set"]
+CONSISTENCY_WINDOW = 5
+
+def dataset_path():
+    return TYPED_DATA_PATH if os.path.exists(TYPED_DATA_PATH) else DATA_PATH
+
+def read_matches(path):
+    if path.endswith(".feather"):
+        from pyarrow import feather
+        df = feather.read_table(path, memory_map=True).to_pandas()
+    else:
+        df = pd.read_csv(path)
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    return df
+
+def read_head_to_head(season=None):
+    # the pipeline's opponent x season table (None until the head_to_head stage has run); career rows have no season
+    if os.path.exists(TYPED_HEAD_TO_HEAD_PATH):
+        from pyarrow import feather
+        table = feather.read_table(TYPED_HEAD_TO_HEAD_PATH, memory_map=True).to_pandas()
+    elif os.path.exists(HEAD_TO_HEAD_PATH):
+        table = pd.read_csv(HEAD_TO_HEAD_PATH)
+    else:
+        return None
+    rows = table["season"].isna() if season is None else table["season"].astype(str) == season
+    return table[rows].reset_index(drop=True)
+
+def season_cards(df, jr_override=None):
+    season = df["season"].astype(str)
+    records = pd.crosstab(season, df["result"]).reindex(columns=["W", "L", "T"], fill_value=0)
+    sums = df.groupby(season)[CARD_STATS].sum()
+    counts = season.value_counts()
+
+    cards = {}
+    for s in [s for s in SEASONS if s in counts.index]:
+        totals = {stat: int(sums.loc[s, stat]) for stat in CARD_STATS}
+        if s == "JR" and jr_override:
+            totals.update(jr_override)
+        cards[s] = {
+            "season": s,
+            "matches": int(counts[s]),
+            "record": [int(records.loc[s, r]) for r in ["W", "L", "T"]],
+            "totals": totals,
+        }
+    return cards
+
+def career_metrics(df):
+    # the at-a-glance charts exclude JR (no stats) and rows without a career stage
+    nojr = df[df["career_stage"].notna() & (df["season"].astype(str) != "JR")]
+    return {
+        stat: {
+            "mean": float(nojr[stat].mean()),
+            "max": float(nojr[stat].max()),
+            "consistency": float(nojr[stat].rolling(CONSISTENCY_WINDOW).std().min()),
+        }
+        for stat in METRIC_STATS
+    }
+
+def build_aggregates(df, jr_override=None):
+    return {"seasons": season_cards(df, jr_override), "metrics": career_metrics(df)}
+
+def load_aggregates(path=None, cache_dir=CACHE_DIR):
+    """
+    Aggregates for the dataset at `path`, built once per file version.
+
+    Results are cached on disk as JSON under the sha256 of the dataset (and
+    the JR totals sheet), so every app process and rerun shares one build per
+    dataset version.
+    """
+    path = path or dataset_path()
+    digest = file_hash(path)
+    if os.path.exists(JR_TOTALS_PATH):
+        digest = hashlib.sha256((digest + file_hash(JR_TOTALS_PATH)).encode()).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{digest}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return json.load(f)
+
+    # JR has no per-match stat exports; its card totals come from the season summary sheet
+    jr_override = load_jr_totals(stats=CARD_STATS) if os.path.exists(JR_TOTALS_PATH) else {}
+    aggregates = build_aggregates(read_matches(path), jr_override)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(aggregates, f, indent=2)
+    os.replace(tmp, cache_path)
+    return aggregates
@@ -0,0 +1,156 @@
+"""
+Indexed lookups over the enriched matches for the app and notebooks
+@created October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard_aggregates import dataset_path, read_matches
+
+# filter(min_attempts=...) style shorthands; any other min_<column> works on that column directly
+MIN_ALIASES = {
+    "min_attempts": "kill_attempts",
+    "min_serves": "serve_attempts",
+    "min_sets": "sets_played",
+}
+
+class MatchStore:
+    """
+    The enriched matches in chronological order with the lookups the app and
+    notebooks repeat, answered from indexes built once instead of a full
+    boolean-mask scan per query:
+
+      by_key        O(1) dict lookup
+      by_season     O(1), a contiguous slice for a single career
+      vs_opponent   O(1) per opponent (slug or name)
+      date_range    O(log n) binary search, a contiguous slice
+      career_range  O(log n) binary search on the sorted career index
+      at_least      O(log n) binary search on a per-column sorted index (built on first use)
+
+    Contiguous results are row slices of `df`, i.e. views that share its
+    memory (pandas copy-on-write copies only if one is modified); others are
+    taken in chronological order.
+    """
+
+    def __init__(self, df):
+        dates = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[ns]")
+        order = np.lexsort((df["match_no"].to_numpy(), dates))
+        if not (order == np.arange(len(df))).all():
+            df, dates = df.iloc[order], dates[order]
+        self.df = df.reset_index(drop=True)
+        self.dates = dates
+
+        self.keys = dict(zip(self.df["match_key"], range(len(self.df))))
+        self.seasons = self._group_slices(self.df["season"].astype(str))
+        slugs = self.df["opponent_slug"].astype(str)
+        self.opponents = {slug: np.asarray(pos) for slug, pos in self.df.groupby(slugs, sort=False).indices.items()}
+        self.slug_of = dict(zip(self.df["opponent"].astype(str), slugs))
+
+        career = self.df["career_match_index"].to_numpy(dtype=float, na_value=np.nan)
+        played = np.flatnonzero(~np.isnan(career))
+        self.career_order = played[np.argsort(career[played], kind="stable")]
+        self.career_sorted = career[self.career_order]
+        self._sorted = {}
+
+    @classmethod
+    def load(cls, path=None):
+        return cls(read_matches(path or dataset_path()))
+
+    def __len__(self):
+        return len(self.df)
+
+    @staticmethod
+    def _group_slices(values):
+        # a group whose rows are one contiguous run (a season, in date order) is stored as a slice
+        groups = {}
+        for name, pos in values.groupby(values, sort=False).indices.items():
+            contiguous = pos[-1] - pos[0] + 1 == len(pos)
+            groups[name] = slice(int(pos[0]), int(pos[-1]) + 1) if contiguous else np.asarray(pos)
+        return groups
+
+    def _rows(self, positions):
+        # row positions -> frame, as a view when they're one contiguous run
+        if isinstance(positions, slice):
+            return self.df.iloc[positions]
+        positions = np.sort(positions)
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            return self.df.iloc[positions[0]:positions[-1] + 1]
+        return self.df.take(positions)
+
+    def by_key(self, match_key):
+        return self.df.iloc[self.keys[match_key]]
+
+    def by_season(self, season):
+        return self._rows(self.seasons.get(season, slice(0, 0)))
+
+    def vs_opponent(self, *opponents):
+        return self._rows(self._opponent_positions(opponents))
+
+    def _opponent_positions(self, opponents):
+        empty = np.empty(0, dtype=np.intp)
+        found = [self.opponents.get(self.slug_of.get(o, o), empty) for o in opponents]
+        return np.unique(np.concatenate(found)) if found else empty
+
+    def date_range(self, start=None, end=None):
+        # inclusive on both ends; either may be omitted
+        return self._rows(self._date_slice(start, end))
+
+    def _date_slice(self, start, end):
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), "left")
+        hi = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end)), "right")
+        return slice(int(lo), int(max(lo, hi)))
+
+    def career_range(self, first=None, last=None):
+        lo = 0 if first is None else np.searchsorted(self.career_sorted, first, "left")
+        hi = len(self.career_sorted) if last is None else np.searchsorted(self.career_sorted, last, "right")
+        return self._rows(self.career_order[lo:hi])
+
+    def _sorted_index(self, column):
+        # (sorted values, row positions) for one numeric column, NaN rows left out
+        if column not in self._sorted:
+            values = pd.to_numeric(self.df[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            present = np.flatnonzero(~np.isnan(values))
+            order = present[np.argsort(values[present], kind="stable")]
+            self._sorted[column] = (values[order], order)
+        return self._sorted[column]
+
+    def _at_least_positions(self, column, minimum):
+        values, order = self._sorted_index(column)
+        return order[np.searchsorted(values, minimum, "left"):]
+
+    def at_least(self, column, minimum):
+        return self._rows(self._at_least_positions(column, minimum))
+
+    def filter(self, season=None, opponent=None, start=None, end=None, **minimums):
+        """
+        Rows matching every given criterion, in date order. `opponent` is one
+        slug/name or a list; minimums are inclusive: min_attempts (kill
+        attempts), min_serves, min_sets, or min_<column> for any numeric column.
+        """
+        rows = slice(0, len(self.df))
+        criteria = []
+        if season is not None:
+            found = self.seasons.get(season, slice(0, 0))
+            if isinstance(found, slice):
+                rows = found
+            else:
+                criteria.append(found)
+        if start is not None or end is not None:
+            dates = self._date_slice(start, end)
+            lo = max(rows.start, dates.start)
+            rows = slice(lo, max(lo, min(rows.stop, dates.stop)))
+
+        if opponent is not None:
+            criteria.append(self._opponent_positions([opponent] if isinstance(opponent, str) else opponent))
+        for name, minimum in minimums.items():
+            if not name.startswith("min_"):
+                raise TypeError(f"filter() got an unexpected keyword argument '{name}'")
+            criteria.append(self._at_least_positions(MIN_ALIASES.get(name, name[len("min_"):]), minimum))
+        positions = rows
+        for found in criteria:
+            if isinstance(positions, slice):
+                positions = found[(found >= rows.start) & (found < rows.stop)]
+            else:
+                positions = np.intersect1d(positions, found, assume_unique=True)
+        return self._rows(positions)
@@ -3,18 +3,24 @@
 @created August 2025
 """
 
+import os
+
 import numpy as np
 import pandas as pd
 from scipy.stats import rankdata
 
-# load in full merged dataset
-df = pd.read_csv("data/NEW_full_merged_dataset.csv")
-original_cols = df.columns.tolist() 
+from records import record_flags
+from set_scores import build_set_table, join_set_features
+from streaks import streaks
+from typed_artifacts import read_stage_csv, write_typed
+from instrumentation import step, run_report
+
+INPUT_PATH = "data/NEW_full_merged_dataset.csv"
+OUTPUT_PATH = "data/NEW_enriched_matches.csv"
+SETS_PATH = "data/cleaned/match_sets.parquet"
 
 # set ordering list for correct dates
 season_order = pd.CategoricalDtype(categories=['FR','SO','JR','SR'], ordered=True)
-df['season'] = df['season'].astype(season_order)
-df = df.sort_values(['season','date','match_no'], kind='mergesort').reset_index(drop=True)
 
 # set up cols for boolean flags
 bool_cols = [
@@ -29,134 +35,12 @@ bool_cols = [
     'birthday_match',
     'is_repeat_opponent'
 ]
-for c in bool_cols:
-    if c in df.columns:
-        df[c] = df[c].fillna(False).astype(bool)
-
-# --------------------------------------------------------------
-# functions
-# --------------------------------------------------------------
-def get_season_high_flags(row):
-    if not row['did_play'] or not row['stats_available']:
-        return ''
-    highs = [field for field in stats_high_fields if pd.notna(row[field]) and row[field] == season_max.loc[row.name, field]]
-    return ';'.join(highs)
-
-def get_career_high_flags(row):
-    if not row['did_play'] or not row['stats_available']:
-        return ''
-    return ';'.join([
-        field for field in stats_high_fields
-        if pd.notna(row[field]) and row[field] == df[field].max()
-    ])
-
-def _streak(series, want='W'):
-    out, c = [], 0
-    for v in series:
-        c = c + 1 if v == want else 0
-        out.append(c)
-    return pd.Series(out, index=series.index)
-
-
-# --------------------------------------------------------------
-# personal & participation flags
-# --------------------------------------------------------------
-df['stats_available'] = df['season'] != 'JR'  # flag JR season with having no stats
-df['played_all_sets'] = df['did_play'] & (df['sets_played'] == df['set_count'])
-
-# win/loss streaks
-df['win_streak'] = (
-    df.groupby('season', group_keys=False, observed=False)['result']
-      .apply(lambda s: _streak(s, 'W'))
-)
-
-df['loss_streak'] = (
-    df.groupby('season', group_keys=False, observed=False)['result']
-      .apply(lambda s: _streak(s, 'L'))
-)
 
-
-# --------------------------------------------------------------
-# match timeline & scheduling
-# --------------------------------------------------------------
-df['prev_result'] = df['result'].shift(1)
-df['prev_win_streak']  = df['win_streak'].shift(1)
-df['prev_loss_streak'] = df['loss_streak'].shift(1)
-
-
-# --------------------------------------------------------------
-# date & opponent details
-# --------------------------------------------------------------
-df['was_set_swept'] = df['set_result'].isin(["0-3","0-2"])
-df['swept_opponent'] = df['set_result'].isin(["3-0","2-0"])
-df['deciding_set_played'] = df['set_result'].isin(['2-1', '1-2', '3-2', '2-3'])
-
-
-# --------------------------------------------------------------
 # career & narrative tags
-# --------------------------------------------------------------
 stats_high_fields = ['kills', 'aces', 'points', 'digs', 'receiving', 
                      'assists', 'total_blocks']
 
-season_max = df.groupby('season', observed=False)[stats_high_fields].transform('max')
-
-df['season_highs_flags'] = df.apply(get_season_high_flags, axis=1)
-df['career_highs_flags'] = df.apply(get_career_high_flags, axis=1)
-df['record_breaker_flag'] = df['career_highs_flags'].ne('')
-
-
-# --------------------------------------------------------------
-# storyline tags
-# --------------------------------------------------------------
-df['set_scores'] = df['set_scores'].fillna('').astype(str)
-
-df['deciding_set_win'] = (  # tight win in final deciding set
-    df['did_play'].fillna(False).astype(bool)
-    & (df['result'] == 'W')
-    & df['set_result'].isin(['2-1', '3-2'])
-    & (
-        df['set_scores']
-        .str.extract(r'\s*(\d+)\s*-\s*(\d+)\s*$')
-        .apply(pd.to_numeric, errors='coerce')
-        .pipe(lambda s: (s[0] - s[1]).abs() == 2)
-    )
-)
-
-df['deciding_set_loss'] = (  # tight loss in final deciding set
-    df['did_play'].fillna(False).astype(bool)
-    & (df['result'] == 'L')
-    & df['set_result'].isin(['1-2', '2-3'])
-    & (
-        df['set_scores']
-        .str.extract(r'\s*(\d+)\s*-\s*(\d+)\s*$')
-        .apply(pd.to_numeric, errors='coerce')
-        .pipe(lambda s: (s[0] - s[1]).abs() == 2)
-    )
-)
-
-
-# --------------------------------------------------------------
-# narrative & rating scores
-# --------------------------------------------------------------
-tight_sets = (df['set_diff'].abs() == 1).fillna(False)
-close_margin = (df['margin_pct'].abs() <= 0.12).fillna(False)
-
-
-# --------------------------------------------------------------
-# skill profile tags
-# --------------------------------------------------------------
-df['low_error_game'] = (
-    (
-        df['serve_errors'] +
-        df['kill_errors'] +
-        df['receiving_errors']
-    ) <= 2
-)
-
-
-# --------------------------------------------------------------
-# save to CSV
-# --------------------------------------------------------------
+# export column order
 col_order = [
     # --- match info ---
     "match_key", "career_match_index", "career_stage", "season",
@@ -165,6 +49,8 @@ col_order = [
 
     # --- match context/scheduling ---
     "days_since_last_match", "is_back_to_back", "match_density_3days",
+    "match_density_7days", "match_density_28days",
+    "set_density_3days", "set_density_7days", "set_density_28days",
     "match_no", "total_matches_that_day", "multi_game_day",
     "first_match_of_day", "last_match_of_day", "same_day_opponent_seq",
 
@@ -191,6 +77,7 @@ col_order = [
 
     # --- achievements/records ---
     "season_highs_flags", "career_highs_flags", "record_breaker_flag",
+    "season_highs_at_time_flags", "career_highs_at_time_flags",
 
     # --- storyline ---
     "deciding_set_win", "deciding_set_loss",
@@ -232,17 +119,126 @@ col_order = [
     "maxpreps"
     ]
 
-missing_from_order = [c for c in original_cols if c not in col_order]
-if missing_from_order:
-    try:
-        max_idx = col_order.index("maxpreps")
-    except ValueError:
-        max_idx = len(col_order)
-    col_order = col_order[:max_idx] + [c for c in missing_from_order if c != "maxpreps"] + col_order[max_idx:]
+# --------------------------------------------------------------
+# functions
+# --------------------------------------------------------------
+def add_advanced_tags(df, sets=None):
+    original_cols = df.columns.tolist()
+
+    # set ordering list for correct dates
+    df['season'] = df['season'].astype(season_order)
+    df = df.sort_values(['season','date','match_no'], kind='mergesort').reset_index(drop=True)
+
+    for c in bool_cols:
+        if c in df.columns:
+            df[c] = df[c].fillna(False).astype(bool)
+
+    # --------------------------------------------------------------
+    # personal & participation flags
+    # --------------------------------------------------------------
+    df['stats_available'] = df['season'] != 'JR'  # flag JR season with having no stats
+    df['played_all_sets'] = df['did_play'] & (df['sets_played'] == df['set_count'])
+
+    # win/loss streaks
+    with step("streaks", rows_in=len(df)):
+        df['win_streak'] = streaks(df['result'] == 'W', groups=df['season'])['current']
+        df['loss_streak'] = streaks(df['result'] == 'L', groups=df['season'])['current']
+
+
+    # --------------------------------------------------------------
+    # match timeline & scheduling
+    # --------------------------------------------------------------
+    df['prev_result'] = df['result'].shift(1)
+    df['prev_win_streak']  = df['win_streak'].shift(1)
+    df['prev_loss_streak'] = df['loss_streak'].shift(1)
+
+
+    # --------------------------------------------------------------
+    # date & opponent details
+    # --------------------------------------------------------------
+    df['was_set_swept'] = df['set_result'].isin(["0-3","0-2"])
+    df['swept_opponent'] = df['set_result'].isin(["3-0","2-0"])
+    df['deciding_set_played'] = df['set_result'].isin(['2-1', '1-2', '3-2', '2-3'])
+
+
+    # --------------------------------------------------------------
+    # career & narrative tags
+    # --------------------------------------------------------------
+    # final highs plus highs as they stood on the day (rows are already in date order)
+    with step("highs_flags", rows_in=len(df)):
+        records = record_flags(df, stats_high_fields, eligible=df['did_play'] & df['stats_available'])
+        df = df.join(records)
+    df['record_breaker_flag'] = df['career_highs_flags'].ne('')
+
+
+    # --------------------------------------------------------------
+    # storyline tags
+    # --------------------------------------------------------------
+    df['set_scores'] = df['set_scores'].fillna('').astype(str)
+
+    with step("set_features", rows_in=len(df)):
+        if sets is None:
+            sets = build_set_table(df['match_key'], df['set_scores'])
+        tight_final_set = join_set_features(df, sets)['last_set_margin'].abs() == 2
+
+    df['deciding_set_win'] = (  # tight win in final deciding set
+        df['did_play'].fillna(False).astype(bool)
+        & (df['result'] == 'W')
+        & df['set_result'].isin(['2-1', '3-2'])
+        & tight_final_set
+    )
 
-missing_still = [c for c in original_cols if c not in col_order]
-assert not missing_still, f"Missing OG columns in export: {missing_still}"
+    df['deciding_set_loss'] = (  # tight loss in final deciding set
+        df['did_play'].fillna(False).astype(bool)
+        & (df['result'] == 'L')
+        & df['set_result'].isin(['1-2', '2-3'])
+        & tight_final_set
+    )
 
-df = df[col_order]
 
-df.to_csv("data/NEW_enriched_matches.csv", index=False)
+    # --------------------------------------------------------------
+    # skill profile tags
+    # --------------------------------------------------------------
+    df['low_error_game'] = (
+        (
+            df['serve_errors'] +
+            df['kill_errors'] +
+            df['receiving_errors']
+        ) <= 2
+    ).fillna(False).astype(bool)  # nullable Int64 stats (in-memory runs) compare to NA, not False
+
+
+    # --------------------------------------------------------------
+    # column order
+    # --------------------------------------------------------------
+    order = list(col_order)
+    missing_from_order = [c for c in original_cols if c not in order]
+    if missing_from_order:
+        try:
+            max_idx = order.index("maxpreps")
+        except ValueError:
+            max_idx = len(order)
+        order = order[:max_idx] + [c for c in missing_from_order if c != "maxpreps"] + order[max_idx:]
+
+    missing_still = [c for c in original_cols if c not in order]
+    assert not missing_still, f"Missing OG columns in export: {missing_still}"
+
+    df = df[[c for c in order if c in df.columns]]
+    return df
+
+def main(input_path=INPUT_PATH, output_path=OUTPUT_PATH, sets_path=SETS_PATH):
+    with step("read") as rec:
+        df = read_stage_csv(input_path)
+        sets = pd.read_parquet(sets_path) if os.path.exists(sets_path) else None
+        rec.rows_out = len(df)
+    with step("add_advanced_tags", rows_in=len(df)) as rec:
+        df = add_advanced_tags(df, sets)
+        rec.rows_out = len(df)
+    with step("write", rows_in=len(df)):
+        df.to_csv(output_path, index=False)
+        write_typed(df, output_path)
+    return df
+
+if __name__ == "__main__":
+    with run_report("enrich"):
+        main()
@@ -0,0 +1,121 @@
+"""
+@name artifact_cache.py
+@created October 2026
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import types
+
+CACHE_DIR = "data/.cache/artifacts"
+MAX_CACHE_BYTES = 500 * 1024 * 1024
+MAX_CACHE_AGE_DAYS = 30
+MANIFEST = "manifest.json"
+
+def local_module_files(module, _seen=None):
+    # source files of `module` and every module it pulls names from that lives next to it (not site-packages)
+    seen = _seen if _seen is not None else set()
+    root = os.path.dirname(os.path.abspath(module.__file__))
+    path = os.path.abspath(module.__file__)
+    if path in seen:
+        return seen
+    seen.add(path)
+
+    for value in vars(module).values():
+        if isinstance(value, types.ModuleType):
+            dep = value
+        else:
+            dep = sys.modules.get(getattr(value, "__module__", None) or "")
+        dep_file = getattr(dep, "__file__", None)
+        if dep_file and os.path.dirname(os.path.abspath(dep_file)) == root:
+            local_module_files(dep, seen)
+    return seen
+
+def code_version(*modules):
+    h = hashlib.sha256()
+    files = set()
+    for module in modules:
+        files |= local_module_files(module)
+    for path in sorted(files):
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def cache_key(stage_name, input_hashes, code):
+    payload = json.dumps({"stage": stage_name, "inputs": input_hashes, "code": code}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _entry_dir(key, cache_dir):
+    return os.path.join(cache_dir, key[:2], key)
+
+def lookup(key, cache_dir=CACHE_DIR):
+    manifest_path = os.path.join(_entry_dir(key, cache_dir), MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    os.utime(manifest_path)  # mark as recently used for eviction
+    return manifest
+
+def restore(key, cache_dir=CACHE_DIR):
+    manifest = lookup(key, cache_dir)
+    if manifest is None:
+        return False
+    entry = _entry_dir(key, cache_dir)
+    for output_path, stored_name in manifest["outputs"].items():
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        shutil.copyfile(os.path.join(entry, stored_name), output_path)
+    return True
+
+def store(key, output_paths, cache_dir=CACHE_DIR):
+    entry = _entry_dir(key, cache_dir)
+    tmp = entry + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    outputs = {}
+    for i, output_path in enumerate(output_paths):
+        if not os.path.exists(output_path):
+            continue
+        stored_name = f"{i}_{os.path.basename(output_path)}"
+        shutil.copyfile(output_path, os.path.join(tmp, stored_name))
+        outputs[output_path] = stored_name
+
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump({"outputs": outputs, "created": time.time()}, f, indent=2)
+
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp, entry)
+
+def evict(max_bytes=MAX_CACHE_BYTES, max_age_days=MAX_CACHE_AGE_DAYS, cache_dir=CACHE_DIR):
+    # drop entries unused for max_age_days, then least recently used until under max_bytes
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for shard in os.listdir(cache_dir):
+        shard_dir = os.path.join(cache_dir, shard)
+        for key in os.listdir(shard_dir) if os.path.isdir(shard_dir) else []:
+            entry = os.path.join(shard_dir, key)
+            manifest_path = os.path.join(entry, MANIFEST)
+            if not os.path.exists(manifest_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+            entries.append((os.path.getmtime(manifest_path), size, entry))
+
+    entries.sort()
+    cutoff = time.time() - max_age_days * 86400
+    total = sum(size for _, size, _ in entries)
+    evicted = []
+    for last_used, size, entry in entries:
+        if last_used >= cutoff and total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        evicted.append(entry)
+    return evicted
@@ -0,0 +1,148 @@
+"""
+@name benchmark.py
+@created October 2026
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic_data import generate_tree
+
+SIZES = [1_000, 10_000]
+BASELINE_PATH = "benchmarks/baseline.json"
+TIME_TOLERANCE = 1.5  # flag a stage that got 50% slower than its baseline...
+MIN_TIME_DELTA = 0.05  # ...by more than this many seconds (ignores timer noise on tiny stages)
+MEMORY_TOLERANCE = 1.25
+SUPERLINEAR_EXPONENT = 1.3  # log-log slope between sizes above this is worth a look
+
+def run_stages(stages, trace_memory):
+    # run each stage from scratch; returns {stage: {"seconds" or "peak_mb" or "error": ...}}
+    results = {}
+    for stage in stages:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                stage.run(None)
+        except (Exception, SystemExit) as e:
+            results[stage.name] = {"error": f"{type(e).__name__}: {e}"}
+            if trace_memory:
+                tracemalloc.stop()
+            break  # later stages read this one's outputs
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[stage.name] = {"peak_mb": peak / 2**20}
+        else:
+            results[stage.name] = {"seconds": elapsed}
+    return results
+
+def benchmark_size(n_matches, seed=0, workers=1, memory=True, keep_dir=None):
+    """
+    Generate a synthetic tree of `n_matches`, then time every pipeline stage
+    on it. With `memory`, a second pass records each stage's peak traced
+    (Python + NumPy) allocation; it is a separate pass because tracemalloc
+    slows pandas-heavy code enough to distort the timings.
+    """
+    import pipeline  # imported late: stage input lists are resolved against the current directory
+
+    root = keep_dir or tempfile.mkdtemp(prefix=f"bench_{n_matches}_")
+    cwd = os.getcwd()
+    try:
+        generate_tree(root, n_matches, seed)
+        os.chdir(root)
+        timed = run_stages(pipeline.build_stages(workers), trace_memory=False)
+        if memory:
+            for name, mem in run_stages(pipeline.build_stages(workers), trace_memory=True).items():
+                timed.setdefault(name, {}).update(mem)
+        return timed
+    finally:
+        os.chdir(cwd)
+        if keep_dir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+def scaling_exponents(results):
+    # per stage, the log-log slope of time vs size between consecutive sizes (1 = linear, 2 = quadratic)
+    sizes = sorted(results, key=int)
+    out = {}
+    for small, large in zip(sizes, sizes[1:]):
+        for stage, big in results[large].items():
+            little = results[small].get(stage, {})
+            if "seconds" in big and little.get("seconds", 0) > 0:
+                slope = math.log(big["seconds"] / little["seconds"]) / math.log(int(large) / int(small))
+                out.setdefault(stage, {})[f"{small}->{large}"] = slope
+    return out
+
+def compare_to_baseline(results, baseline):
+    regressions = []
+    for size, stages in results.items():
+        for stage, now in stages.items():
+            then = baseline.get(size, {}).get(stage)
+            if not then:
+                continue
+            if "error" in now and "error" not in then:
+                regressions.append(f"{stage} @ {size}: now fails ({now['error']})")
+            if "seconds" in now and "seconds" in then:
+                if now["seconds"] > then["seconds"] * TIME_TOLERANCE and now["seconds"] - then["seconds"] > MIN_TIME_DELTA:
+                    regressions.append(f"{stage} @ {size}: {then['seconds']:.2f}s -> {now['seconds']:.2f}s")
+            if "peak_mb" in now and "peak_mb" in then and now["peak_mb"] > then["peak_mb"] * MEMORY_TOLERANCE:
+                regressions.append(f"{stage} @ {size}: {then['peak_mb']:.1f} MB -> {now['peak_mb']:.1f} MB peak")
+    return regressions
+
+def print_report(results, exponents):
+    for size in sorted(results, key=int):
+        print(f"\n📏 {int(size):,} matches")
+        for stage, r in results[size].items():
+            if "error" in r:
+                print(f"   {stage:<16} ❌ {r['error']}")
+                continue
+            mem = f"{r['peak_mb']:>9.1f} MB" if "peak_mb" in r else ""
+            print(f"   {stage:<16} {r.get('seconds', float('nan')):>8.2f}s {mem}")
+    for stage, slopes in exponents.items():
+        worst = max(slopes.values())
+        if worst > SUPERLINEAR_EXPONENT:
+            print(f"⚠️  {stage} scales superlinearly: " + ", ".join(f"{k}: n^{v:.2f}" for k, v in slopes.items()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory-profile each pipeline stage on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="total matches per run, e.g. 1000 10000 100000")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--output", help="also write this run's results as JSON")
+    args = parser.parse_args()
+
+    baseline_path = os.path.abspath(args.baseline)
+    results = {str(n): benchmark_size(n, args.seed, args.workers, memory=not args.no_memory) for n in args.sizes}
+    print_report(results, scaling_exponents(results))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n💾 Baseline written to {args.baseline}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            regressions = compare_to_baseline(results, json.load(f))
+        if regressions:
+            print("\n🚨 Regressions vs baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("\n✅ No regressions vs baseline.")
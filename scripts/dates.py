@@ -0,0 +1,54 @@
+"""
+@name dates.py
+@created October 2026
+"""
+
+import pandas as pd
+
+# raw date layouts seen across the schedules and stat exports, most specific first
+DATE_FORMATS = [
+    ("%m/%d/%Y", r"^\d{1,2}/\d{1,2}/\d{4}$"),
+    ("%Y-%m-%d", r"^\d{4}-\d{1,2}-\d{1,2}$"),
+    ("%m/%d", r"^\d{1,2}/\d{1,2}$"),
+]
+
+def normalize_dates(dates, year=None, seasons=None, season_years=None):
+    """
+    Parse a whole date column to datetime64 with vectorized to_datetime.
+
+    Year-less "MM/DD" values get their year from `year` (a scalar) or from
+    `seasons` mapped through `season_years` (e.g. {"FR": 2016}). With
+    `seasons`, every value takes its season's year, including ones that
+    carry their own (a mis-yeared export row lands in its season, not
+    another). Values that match no known format, or have no year to inject,
+    become NaT.
+    """
+    raw = pd.Series(dates)
+    text = raw.astype("string").str.strip()
+    out = pd.Series(pd.NaT, index=raw.index, dtype="datetime64[ns]")
+
+    if seasons is not None:
+        years = pd.Series(seasons, index=raw.index).map(season_years)
+    else:
+        years = pd.Series(year, index=raw.index, dtype="Float64")
+
+    for fmt, pattern in DATE_FORMATS:
+        mask = text.str.match(pattern).fillna(False).to_numpy(dtype=bool)
+        if not mask.any():
+            continue
+        values = text[mask]
+        if fmt == "%m/%d":
+            values = values + "/" + years[mask].astype("Int64").astype("string")
+            fmt = "%m/%d/%Y"
+        out[mask] = pd.to_datetime(values, format=fmt, errors="coerce").to_numpy(dtype="datetime64[ns]")
+
+    if seasons is not None:
+        # the season decides the year; only month/day are read from the file
+        month_day = out.dt.strftime("%m/%d").astype("string")
+        out = pd.Series(
+            pd.to_datetime(month_day + "/" + years.astype("Int64").astype("string"), format="%m/%d/%Y", errors="coerce")
+            .to_numpy(dtype="datetime64[ns]"),
+            index=raw.index,
+        )
+
+    return out
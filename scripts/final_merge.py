@@ -3,16 +3,24 @@
 @created August 2025
 """
 
-import pandas as pd
+import json
 import os
 
-SCHEDULE_PATH = "data/cleaned/cleaned_master_schedule.csv"
-STATS_PATH = "data/cleaned/NEW_all_stats_merged.csv"
+import pandas as pd
+
+from hashing import file_hash, frame_hash, row_hashes, column_hashes
+from schedule_cleaning import OUTPUT_PATH as SCHEDULE_PATH
+from stats_merge import STAT_RENAME_MAP, STATS_OUTPUT_PATH as STATS_PATH
+from typed_artifacts import read_stage_csv, write_typed
+from instrumentation import step, run_report
 
-def load_data():
+OUTPUT_PATH = "data/NEW_full_merged_dataset.csv"
+INTEGRITY_CACHE_PATH = "data/cleaned/.integrity_cache.json"
+
+def load_data(schedule_path=SCHEDULE_PATH, stats_path=STATS_PATH):
     print("Loading...")
-    schedule_df = pd.read_csv(SCHEDULE_PATH)
-    stats_df = pd.read_csv(STATS_PATH)
+    schedule_df = read_stage_csv(schedule_path)
+    stats_df = read_stage_csv(stats_path)
     print(f"Loaded {len(schedule_df)} rows from schedule")
     print(f"Loaded {len(stats_df)} rows from stats")
     print()
@@ -42,7 +50,27 @@ def compare_match_keys(schedule_df, stats_df):
 
     return not only_in_schedule and not only_in_stats
 
-def validate_stat_integrity(stats_df, cleaned_dir="data/cleaned"):
+def load_integrity_cache(cache_path=INTEGRITY_CACHE_PATH):
+    if not os.path.exists(cache_path):
+        return {}
+    with open(cache_path) as f:
+        return json.load(f)
+
+def save_integrity_cache(cache, cache_path=INTEGRITY_CACHE_PATH):
+    with open(cache_path, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+def stat_frame(df):
+    # stat columns only, keyed by match_key, every value as float64 so equal numbers hash equally
+    meta_cols = ["date", "result", "opponent", "season", "opponent_slug", "sets_played", "match_no"]
+    df = df.drop(columns=[c for c in meta_cols if c in df.columns], errors="ignore")
+    df = df.set_index("match_key")
+    df.index = df.index.astype(str)
+    df.columns = df.columns.astype(str)
+    return df.apply(pd.to_numeric, errors="coerce").astype(float)
+
+def validate_stat_integrity(stats_df, cleaned_dir="data/cleaned", cache_path=INTEGRITY_CACHE_PATH, season_frames=None):
+    # season_frames: {season_code: merged season frame} held in memory, checked instead of the season files
     print("\n🔍 Validating stat integrity...")
 
     seasons = {
@@ -52,30 +80,40 @@ def validate_stat_integrity(stats_df, cleaned_dir="data/cleaned"):
     }
 
     all_good = True
+    cache = load_integrity_cache(cache_path)
 
     stats_df = stats_df[stats_df["result"].notna()]
 
     for season_code, filename in seasons.items():
         file_path = os.path.join(cleaned_dir, filename)
-        if not os.path.exists(file_path):
+        in_memory = season_frames is not None
+        if in_memory and season_code not in season_frames:
+            print(f"❌ Missing season stats for {season_code}")
+            all_good = False
+            continue
+        if not in_memory and not os.path.exists(file_path):
             print(f"❌ Missing season stats file: {filename}")
             all_good = False
             continue
 
-        season_df = pd.read_csv(file_path)
-        merged_df = stats_df[stats_df["season"] == season_code]
-
-        season_df = season_df.set_index("match_key")
-        merged_df = merged_df.set_index("match_key")
+        merged_df = stat_frame(stats_df[stats_df["season"] == season_code])
+        if merged_df.index.duplicated().any():
+            dupes = merged_df.index[merged_df.index.duplicated()].unique()
+            print(f"❌ Duplicate match_keys in merged_df for {season_code}: {list(dupes)}")
+            all_good = False
+            continue
 
-        meta_cols = ["date", "result", "opponent", "season", "opponent_slug", "sets_played", "match_no"]
-        season_df = season_df.drop(columns=[c for c in meta_cols if c in season_df.columns], errors="ignore")
-        merged_df = merged_df.drop(columns=[c for c in meta_cols if c in merged_df.columns], errors="ignore")
+        # unchanged season file + unchanged merged slice -> already verified, skip the parse
+        fingerprint = None
+        if not in_memory:
+            fingerprint = {"season_file": file_hash(file_path), "merged": frame_hash(merged_df.sort_index())}
+            if cache.get(filename) == fingerprint:
+                print(f"✅ Stats for {season_code} match exactly (cached).")
+                continue
 
-        season_df.index = season_df.index.astype(str)
-        merged_df.index = merged_df.index.astype(str)
-        season_df.columns = season_df.columns.astype(str)
-        merged_df.columns = merged_df.columns.astype(str)
+        season_df = season_frames[season_code] if in_memory else read_stage_csv(file_path)
+        season_df = season_df.rename(columns=STAT_RENAME_MAP)
+        season_df = stat_frame(season_df)
 
         if season_df.index.duplicated().any():
             dupes = season_df.index[season_df.index.duplicated()].unique()
@@ -83,64 +121,42 @@ def validate_stat_integrity(stats_df, cleaned_dir="data/cleaned"):
             all_good = False
             continue
 
-        if merged_df.index.duplicated().any():
-            dupes = merged_df.index[merged_df.index.duplicated()].unique()
-            print(f"❌ Duplicate match_keys in merged_df for {season_code}: {list(dupes)}")
-            all_good = False
-            continue
-
         common_cols = sorted(season_df.columns.intersection(merged_df.columns))
         common_index = sorted(season_df.index.intersection(merged_df.index))
 
         season_df = season_df.reindex(index=common_index, columns=common_cols)
         merged_df = merged_df.reindex(index=common_index, columns=common_cols)
 
-        for col in common_cols:
-            try:
-                merged_df[col] = merged_df[col].astype(season_df[col].dtype)
-            except Exception:
-                merged_df[col] = merged_df[col].astype(float)
-
-        try:
-            season_df = season_df[common_cols].sort_index()
-            merged_df = merged_df[common_cols].sort_index()
-
-            print(f"[{season_code}] comparing {season_df.shape} vs {merged_df.shape}")
-
-            diffs = season_df.compare(merged_df, align_axis=0)
-            if not diffs.empty:
-                print(f"⚠️ Mismatch found in {season_code} stats! Showing up to 10 differences:")
-                print(diffs.head(10))
-
-                sample_key = diffs.index.get_level_values(0)[0]
-                print("🧪 match_key:", sample_key)
-                print("Season file:\n", season_df.loc[sample_key])
-                print("All stats merged:\n", merged_df.loc[sample_key])
-
-                all_good = False
-            else:
-                print(f"✅ Stats for {season_code} match exactly.")
-        except ValueError as ve:
-            print(f"❌ Comparison error in {season_code}: {ve}")
-            print(f"  🟡 In {filename} only: {sorted(set(season_df.columns) - set(merged_df.columns))}")
-            print(f"  🔴 In all_stats_merged only: {sorted(set(merged_df.columns) - set(season_df.columns))}")
-            all_good = False
+        print(f"[{season_code}] comparing {season_df.shape} vs {merged_df.shape}")
 
-    return all_good
+        # compare hash vectors; only rows whose hashes differ get a cell-level diff
+        differing = season_df.index[row_hashes(season_df).to_numpy() != row_hashes(merged_df).to_numpy()]
+        if len(differing):
+            season_cols, merged_cols = column_hashes(season_df), column_hashes(merged_df)
+            bad_cols = [col for col in common_cols if season_cols[col] != merged_cols[col]]
 
-if __name__ == "__main__":
-    schedule_df, stats_df = load_data()
+            print(f"⚠️ Mismatch found in {season_code} stats! {len(differing)} row(s), columns: {bad_cols}")
+            diffs = season_df.loc[differing, bad_cols].compare(merged_df.loc[differing, bad_cols], align_axis=0)
+            print("Showing up to 10 differences:")
+            print(diffs.head(10))
 
-    if not compare_match_keys(schedule_df, stats_df):
-        print("❌ Halting due to match_key mismatch. Please fix before continuing.")
-        exit(1)
+            sample_key = differing[0]
+            print("🧪 match_key:", sample_key)
+            print("Season file:\n", season_df.loc[sample_key, bad_cols])
+            print("All stats merged:\n", merged_df.loc[sample_key, bad_cols])
 
-    if not validate_stat_integrity(stats_df):
-        print("❌ Stat mismatches found. Please resolve before proceeding.")
-        exit(1)
+            cache.pop(filename, None)
+            all_good = False
+        else:
+            print(f"✅ Stats for {season_code} match exactly.")
+            if fingerprint is not None:
+                cache[filename] = fingerprint
 
-    print("\n🎯 All checks passed. Proceeding to final merge...")
-    
+    if season_frames is None:
+        save_integrity_cache(cache, cache_path)
+    return all_good
+
+def merge_schedule_and_stats(schedule_df, stats_df):
     print("\nMerging schedule and stats...")
 
     # drop duplicate stat columns that exist in schedule
@@ -165,6 +181,7 @@ if __name__ == "__main__":
     core_order = [
         "match_key", "career_match_index", "career_stage", "season", "season_match_number", "season_stage",
         "date", "day_of_week", "week_of_season", "days_since_last_match", "is_back_to_back", "match_density_3days",
+        "match_density_7days", "match_density_28days", "set_density_3days", "set_density_7days", "set_density_28days",
         "match_no", "total_matches_that_day", "multi_game_day", "first_match_of_day", "last_match_of_day", "same_day_opponent_seq",
         "opponent", "opponent_slug", "season_opponent_seq", "is_repeat_opponent", "rivalry", "deaf_school",
         "match_type", "game_importance", "game_importance_score", "event_name", "milestone_flag",
@@ -193,7 +210,44 @@ if __name__ == "__main__":
     merged_df = merged_df[[col for col in final_order if col in merged_df.columns]]
 
     print(f"✅ Merged dataset: {len(merged_df)} matches, {merged_df.shape[1]} columns")
+    return merged_df
+
+def check_and_merge(schedule_df, stats_df, season_frames=None):
+    # key alignment + stat integrity, then the merge; returns None if a check failed
+    with step("compare_match_keys", rows_in=len(schedule_df) + len(stats_df)):
+        keys_match = compare_match_keys(schedule_df, stats_df)
+    if not keys_match:
+        print("❌ Halting due to match_key mismatch. Please fix before continuing.")
+        return None
 
-    merged_path = "data/NEW_full_merged_dataset.csv"
-    merged_df.to_csv(merged_path, index=False)
-    print(f"📦 Saved: {merged_path}")
+    with step("validate_stat_integrity", rows_in=len(stats_df)):
+        stats_valid = validate_stat_integrity(stats_df, season_frames=season_frames)
+    if not stats_valid:
+        print("❌ Stat mismatches found. Please resolve before proceeding.")
+        return None
+
+    print("\n🎯 All checks passed. Proceeding to final merge...")
+
+    with step("merge", rows_in=len(schedule_df) + len(stats_df)) as rec:
+        merged_df = merge_schedule_and_stats(schedule_df, stats_df)
+        rec.rows_out = len(merged_df)
+    return merged_df
+
+def main(schedule_path=SCHEDULE_PATH, stats_path=STATS_PATH, output_path=OUTPUT_PATH):
+    with step("load") as rec:
+        schedule_df, stats_df = load_data(schedule_path, stats_path)
+        rec.rows_out = len(schedule_df) + len(stats_df)
+
+    merged_df = check_and_merge(schedule_df, stats_df)
+    if merged_df is None:
+        exit(1)
+
+    with step("write", rows_in=len(merged_df)):
+        merged_df.to_csv(output_path, index=False)
+        write_typed(merged_df, output_path)
+    print(f"📦 Saved: {output_path}")
+    return merged_df
+
+if __name__ == "__main__":
+    with run_report("final_merge"):
+        main()
@@ -0,0 +1,33 @@
+"""
+@name hashing.py
+@created October 2026
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+
+def file_hash(path):
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def row_hashes(df):
+    # one uint64 per row (index included), so two frames compare as two vectors
+    return pd.util.hash_pandas_object(df, index=True)
+
+def column_hashes(df):
+    return {
+        col: hashlib.sha256(pd.util.hash_pandas_object(df[col], index=True).to_numpy().tobytes()).hexdigest()
+        for col in df.columns
+    }
+
+def frame_hash(df):
+    h = hashlib.sha256(",".join(map(str, df.columns)).encode())
+    h.update(row_hashes(df).to_numpy().tobytes())
+    return h.hexdigest()
@@ -0,0 +1,180 @@
+"""
+@name instrumentation.py
+@created October 2026
+"""
+
+import collections
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_DIR = "data/.reports"
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples in profile mode
+
+_run = None  # the active Run, if any; steps outside a run cost one attribute check
+
+class Step:
+    def __init__(self, path, rows_in=None):
+        self.path = path
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = None
+        self.peak_mb = None
+        self.max_rss_mb = None
+        self._peak_bytes = 0
+
+    def as_dict(self):
+        return {k: v for k, v in vars(self).items() if v is not None and not k.startswith("_")}
+
+def max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (2**20 if sys.platform == "darwin" else 2**10)  # bytes on macOS, KB elsewhere
+
+class StackSampler(threading.Thread):
+    """
+    Samples the main thread's Python stack every `interval` seconds and counts
+    identical stacks, i.e. the "collapsed" format flame graph tools read
+    (frame;frame;frame count).
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.counts = collections.Counter()
+        self.target = threading.main_thread().ident
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Run:
+    def __init__(self, name, trace_memory=False, profile=False):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.steps = []
+        self.stack = []
+        self.started = time.time()
+        self.seconds = None
+
+    def report(self):
+        return {
+            "run": self.name,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "seconds": self.seconds,
+            "max_rss_mb": max_rss_mb(),
+            "steps": [s.as_dict() for s in self.steps],
+        }
+
+@contextlib.contextmanager
+def step(name, rows_in=None):
+    """
+    Time one logical step. Set `.rows_out` on the yielded Step to record the
+    output size. Steps nest ("enrich/streaks"); outside a run this is a no-op.
+    """
+    rec = Step(name, rows_in)
+    if _run is None:
+        yield rec
+        return
+
+    parent = _run.stack[-1] if _run.stack else None
+    rec.path = f"{parent.path}/{name}" if parent else name
+    _run.stack.append(rec)
+    _run.steps.append(rec)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        # tracemalloc has one peak counter: fold it into the parent before restarting it for this step
+        if parent is not None:
+            parent._peak_bytes = max(parent._peak_bytes, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield rec
+    finally:
+        rec.seconds = time.perf_counter() - start
+        if tracing:
+            peak = max(rec._peak_bytes, tracemalloc.get_traced_memory()[1])
+            rec.peak_mb = peak / 2**20
+            if parent is not None:
+                parent._peak_bytes = max(parent._peak_bytes, peak)
+            tracemalloc.reset_peak()
+        rec.max_rss_mb = max_rss_mb()
+        _run.stack.pop()
+
+@contextlib.contextmanager
+def run_report(name, report_dir=REPORT_DIR, trace_memory=False, profile=False):
+    """
+    Instrument one invocation: every `step` inside is recorded, and on exit a
+    JSON report is written to <report_dir>/<name>_<timestamp>.json. With
+    `profile`, a cProfile dump (.prof) and a sampled collapsed-stack file
+    (.collapsed, for flamegraph.pl / speedscope) are written next to it.
+    A run inside another run just becomes a step of the outer one.
+    """
+    global _run
+    if _run is not None:
+        with step(name) as rec:
+            yield rec
+        return
+
+    _run = current = Run(name, trace_memory, profile)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profiler = sampler = None
+    if profile:
+        profiler = cProfile.Profile()
+        sampler = StackSampler()
+        sampler.start()
+        profiler.enable()
+
+    start = time.perf_counter()
+    try:
+        with step(name) as rec:
+            yield rec
+    finally:
+        current.seconds = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            sampler.stop()
+        if started_tracing:
+            tracemalloc.stop()
+        _run = None
+
+        os.makedirs(report_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(current.started))
+        base = os.path.join(report_dir, f"{name}_{stamp}")
+        with open(f"{base}.json", "w") as f:
+            json.dump(current.report(), f, indent=2)
+        if profiler is not None:
+            profiler.dump_stats(f"{base}.prof")
+            sampler.write(f"{base}.collapsed")
+        print(f"📊 Run report: {base}.json")
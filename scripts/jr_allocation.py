@@ -0,0 +1,101 @@
+"""
+@name jr_allocation.py
+@created October 2026
+"""
+
+import os
+
+import numpy as np
+
+from jr_totals import JR_TOTALS_PATH, JR_TOTAL_STATS, load_jr_totals
+from typed_artifacts import read_stage_csv, write_typed
+
+INPUT_PATH = "data/NEW_enriched_matches.csv"
+OUTPUT_PATH = "data/NEW_jr_allocated_stats.csv"
+
+ALLOCATED_STATS = JR_TOTAL_STATS
+
+# pseudo-sets of the career rate mixed into each opponent's rate, so a one-match opponent can't dominate
+PRIOR_SETS = 10.0
+
+def per_set_rates(history, stats=ALLOCATED_STATS, by="opponent_slug", prior_sets=PRIOR_SETS):
+    """
+    Per-set rate of each stat for every `by` group in the seasons with stats,
+    shrunk toward the career rate:
+
+        (group stat + prior_sets * career rate) / (group sets + prior_sets)
+
+    Returns (group rates DataFrame indexed by group, career rates Series).
+    """
+    sets = history["sets_played"].to_numpy(dtype=float)
+    career = history[stats].sum() / sets.sum()
+    grouped = history.groupby(by, observed=True)[stats + ["sets_played"]].sum()
+    rates = grouped[stats].add(prior_sets * career, axis=1).div(grouped["sets_played"] + prior_sets, axis=0)
+    return rates, career
+
+def largest_remainder(quotas, totals):
+    """
+    Round a (rows x stats) matrix of real-valued quotas to integers whose
+    columns sum exactly to `totals`: floor everything, then hand the leftover
+    units to the largest fractional parts (earlier rows win ties).
+    """
+    quotas = np.asarray(quotas, dtype=float)
+    base = np.floor(quotas)
+    remainder = quotas - base
+    deficit = np.asarray(totals, dtype=np.int64) - base.sum(axis=0).astype(np.int64)
+
+    order = np.argsort(-remainder, axis=0, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(len(quotas))[:, None], axis=0)
+    return (base + (ranks < deficit[None, :])).astype(np.int64)
+
+def usable_weights(weights, targets):
+    # a stat never recorded before has no rate to learn from: fall back to exposure alone
+    exposure = targets["sets_played"].to_numpy(dtype=float)[:, None]
+    return np.where(weights.sum(axis=0)[None, :] > 0, weights, exposure)
+
+def allocation_weights(targets, history, stats=ALLOCATED_STATS, by="opponent_slug", prior_sets=PRIOR_SETS):
+    # expected count per match: exposure (sets played) x the opponent's learned per-set rate
+    rates, career = per_set_rates(history, stats, by, prior_sets)
+    match_rates = rates.reindex(targets[by]).to_numpy(dtype=float, na_value=np.nan)
+    match_rates = np.where(np.isnan(match_rates), career.to_numpy()[None, :], match_rates)
+    return targets["sets_played"].to_numpy(dtype=float)[:, None] * match_rates
+
+def split_history(df):
+    # JR matches played (the allocation targets) vs the FR/SO/SR matches with sets to learn rates from
+    targets = df[(df["season"].astype(str) == "JR") & df["did_play"].fillna(False).astype(bool)]
+    targets = targets[targets["sets_played"].fillna(0) > 0]
+    history = df[df["season"].astype(str) != "JR"].dropna(subset=["sets_played"])
+    history = history[history["sets_played"] > 0]
+    return targets, history
+
+def allocate_junior_stats(df, totals, stats=ALLOCATED_STATS, by="opponent_slug", prior_sets=PRIOR_SETS):
+    """
+    Distribute JR season totals across the JR matches played.
+
+    Each match gets totals * weight / sum(weights) where the weight is
+    sets_played times the per-set rate learned from FR/SO/SR against that
+    opponent (career rate for new opponents), then rounded with largest
+    remainder so every stat adds back up to its season total exactly.
+    Returns one row per JR match with match_key, sets_played and the stats.
+    """
+    targets, history = split_history(df)
+    weights = usable_weights(allocation_weights(targets, history, stats, by, prior_sets), targets)
+    total_values = np.array([totals[stat] for stat in stats], dtype=float)
+    quotas = weights / weights.sum(axis=0)[None, :] * total_values[None, :]
+    allocated = largest_remainder(quotas, total_values)
+
+    out = targets[["match_key", "date", "opponent", "sets_played"]].reset_index(drop=True)
+    out[stats] = allocated
+    return out
+
+def main(input_path=INPUT_PATH, totals_path=JR_TOTALS_PATH, output_path=OUTPUT_PATH):
+    df = read_stage_csv(input_path)
+    allocated = allocate_junior_stats(df, load_jr_totals(totals_path))
+    allocated.to_csv(output_path, index=False)
+    write_typed(allocated, output_path)
+    print(f"✅ Allocated JR season totals across {len(allocated)} matches: {os.path.basename(output_path)}")
+    return allocated
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+@name jr_simulation.py
+@created October 2026
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from jr_allocation import (
+    ALLOCATED_STATS, INPUT_PATH, JR_TOTALS_PATH,
+    allocation_weights, load_jr_totals, split_history, usable_weights,
+)
+from typed_artifacts import read_stage_csv, write_typed
+
+MATCH_BANDS_PATH = "data/NEW_jr_match_bands.csv"
+SEASON_BANDS_PATH = "data/NEW_jr_season_bands.csv"
+
+N_DRAWS = 20_000
+CHUNK_DRAWS = 2_000  # fixed chunking keeps results identical for any worker count
+MAX_CHUNK_CELLS = 4_000_000  # draws x matches x stats per batch; bigger schedules get smaller batches
+SEED = 2018
+PERCENTILES = [5, 25, 50, 75, 95]
+MIN_DISPERSION = 1e-3
+
+def dispersion(history, stats=ALLOCATED_STATS):
+    """
+    Extra-Poisson spread of each stat's per-match counts in FR/SO/SR, as phi in
+    Var(x) = mu + phi * mu^2 with mu = sets_played * career per-set rate
+    (method of moments, floored at MIN_DISPERSION).
+    """
+    sets = history["sets_played"].to_numpy(dtype=float)[:, None]
+    counts = history[stats].fillna(0).to_numpy(dtype=float)
+    mu = sets * (counts.sum(axis=0) / sets.sum())[None, :]
+    phi = (((counts - mu) ** 2 - mu).sum(axis=0)) / (mu ** 2).sum(axis=0)
+    return np.maximum(np.nan_to_num(phi, nan=MIN_DISPERSION), MIN_DISPERSION)
+
+def draw_chunk(seed_seq, n_draws, weights, phi, totals):
+    """
+    One batch of JR seasons, shape (n_draws, matches, stats).
+
+    Each match's rate is Gamma with mean = its allocation weight and the
+    historical dispersion; normalizing gives that draw's share of the season,
+    and the fixed season total is split multinomially over those shares, so
+    every simulated season sums exactly to the known totals.
+    """
+    rng = np.random.default_rng(seed_seq)
+    shape = 1.0 / phi  # (stats,)
+    scale = weights * phi[None, :]  # (matches, stats)
+    rates = rng.gamma(shape[None, None, :], scale[None, :, :], size=(n_draws,) + weights.shape)
+    shares = rates / rates.sum(axis=1, keepdims=True)
+    # multinomial wants the category axis last: (draws, stats, matches)
+    counts = rng.multinomial(totals, np.moveaxis(shares, 1, 2))
+    return np.moveaxis(counts, 2, 1).astype(np.int32)
+
+def summarize_chunk(counts, sets):
+    """
+    Everything the bands need from one batch of draws, so the batch itself can
+    be dropped: per-(match, stat) value counts (counts are small integers, so
+    this histogram gives the exact percentiles), their sum for the mean, and
+    each draw's season highs (one value per draw and stat).
+    """
+    n_draws, n_matches, n_stats = counts.shape
+    width = int(counts.max()) + 1 if counts.size else 1
+    cell = np.arange(n_matches * n_stats, dtype=np.int64).reshape(n_matches, n_stats) * width
+    hist = np.bincount((cell[None, :, :] + counts).ravel(), minlength=n_matches * n_stats * width)
+    return {
+        "hist": hist.reshape(n_matches, n_stats, width),
+        "sum": counts.sum(axis=0, dtype=np.int64),
+        "season_high": counts.max(axis=1),
+        "season_high_per_set": (counts / sets[None, :, None]).max(axis=1),
+    }
+
+def draw_summary(seed_seq, n_draws, weights, phi, totals, sets):
+    # runs in the worker: only the summary crosses the process boundary
+    return summarize_chunk(draw_chunk(seed_seq, n_draws, weights, phi, totals), sets)
+
+def merge_summaries(summaries):
+    width = max(s["hist"].shape[2] for s in summaries)
+    hist = np.zeros(summaries[0]["hist"].shape[:2] + (width,), dtype=np.int64)
+    for s in summaries:
+        hist[:, :, :s["hist"].shape[2]] += s["hist"]
+    return {
+        "hist": hist,
+        "sum": sum(s["sum"] for s in summaries),
+        "season_high": np.concatenate([s["season_high"] for s in summaries]),
+        "season_high_per_set": np.concatenate([s["season_high_per_set"] for s in summaries]),
+    }
+
+def chunk_sizes(n_draws, n_cells, chunk_draws=CHUNK_DRAWS, max_cells=MAX_CHUNK_CELLS):
+    # depends only on the problem size (never on workers), so the seed streams and results are stable
+    chunk_draws = max(1, min(chunk_draws, max_cells // max(n_cells, 1)))
+    return [chunk_draws] * (n_draws // chunk_draws) + ([n_draws % chunk_draws] if n_draws % chunk_draws else [])
+
+def simulate(weights, phi, totals, sets, n_draws=N_DRAWS, seed=SEED, workers=1, chunk_draws=CHUNK_DRAWS):
+    """
+    Draw `n_draws` JR seasons in batches and reduce each batch as it lands.
+    Memory is one batch plus the summaries, not draws x matches x stats.
+    """
+    sizes = chunk_sizes(n_draws, weights.size, chunk_draws)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(s, n, weights, phi, totals, sets) for s, n in zip(seeds, sizes)]
+
+    if workers <= 1:
+        summaries = [draw_summary(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summaries = list(pool.map(draw_summary, *zip(*args)))
+    return merge_summaries(summaries)
+
+def hist_percentiles(hist, percentiles=PERCENTILES):
+    """
+    np.percentile's default (linear) percentiles over the last axis of a
+    value-count histogram, i.e. of the sample it counts, without expanding it.
+    The i-th smallest value is the number of bins whose cumulative count is <= i.
+    """
+    n = int(hist[(0,) * (hist.ndim - 1)].sum())
+    cdf = np.cumsum(hist, axis=-1)
+    out = []
+    for p in percentiles:
+        q = p / 100
+        index = n * q + (1 + q * -1) - 1  # numpy's virtual index for the linear method
+        lo = int(np.floor(index))
+        t = index - lo
+        below = (cdf <= lo).sum(axis=-1).astype(float)
+        above = (cdf <= min(lo + 1, n - 1)).sum(axis=-1).astype(float)
+        diff = above - below
+        out.append(np.where(t >= 0.5, above - diff * (1 - t), below + diff * t))
+    return np.stack(out)
+
+def match_bands(summary, targets, n_draws, stats=ALLOCATED_STATS, percentiles=PERCENTILES):
+    # one row per (match, stat): mean and percentiles over the draws
+    q = hist_percentiles(summary["hist"], percentiles)  # (percentiles, matches, stats)
+    mean = summary["sum"] / n_draws
+    n_matches, n_stats = mean.shape
+    out = pd.DataFrame({
+        "match_key": np.repeat(targets["match_key"].to_numpy(), n_stats),
+        "stat": np.tile(stats, n_matches),
+        "mean": mean.ravel(),
+    })
+    for p, values in zip(percentiles, q):
+        out[f"p{p}"] = values.ravel()
+    return out
+
+def season_bands(summary, stats=ALLOCATED_STATS, percentiles=PERCENTILES):
+    # season totals are fixed by construction, so the season-level bands are on the JR season high per stat
+    rows = []
+    for measure in ["season_high", "season_high_per_set"]:
+        values = summary[measure]
+        q = np.percentile(values, percentiles, axis=0)
+        for j, stat in enumerate(stats):
+            row = {"stat": stat, "measure": measure, "mean": values[:, j].mean()}
+            row.update({f"p{p}": q[i, j] for i, p in enumerate(percentiles)})
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+def simulate_junior_stats(df, totals, n_draws=N_DRAWS, seed=SEED, workers=1, stats=ALLOCATED_STATS):
+    """
+    Monte Carlo bands for the JR per-match stats, conditioned on the known
+    season totals. Returns (per-match bands, per-season bands).
+    """
+    targets, history = split_history(df)
+    weights = usable_weights(allocation_weights(targets, history, stats), targets)
+    totals = np.array([totals[stat] for stat in stats], dtype=np.int64)
+    sets = targets["sets_played"].to_numpy(dtype=float)
+    summary = simulate(weights, dispersion(history, stats), totals, sets, n_draws, seed, workers)
+    return match_bands(summary, targets, n_draws, stats), season_bands(summary, stats)
+
+def main(input_path=INPUT_PATH, totals_path=JR_TOTALS_PATH, match_path=MATCH_BANDS_PATH,
+         season_path=SEASON_BANDS_PATH, n_draws=N_DRAWS, seed=SEED, workers=1):
+    df = read_stage_csv(input_path)
+    by_match, by_season = simulate_junior_stats(df, load_jr_totals(totals_path), n_draws, seed, workers)
+    by_match.to_csv(match_path, index=False)
+    write_typed(by_match, match_path)
+    by_season.to_csv(season_path, index=False)
+    print(f"✅ {n_draws} simulated JR seasons -> {os.path.basename(match_path)}, {os.path.basename(season_path)}")
+    return by_match, by_season
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate JR per-match stat bands.")
+    parser.add_argument("--draws", type=int, default=N_DRAWS, help="number of simulated seasons")
+    parser.add_argument("--seed", type=int, default=SEED, help="root seed; same seed gives the same bands")
+    parser.add_argument("--workers", type=int, default=1, help="processes to spread draw batches across")
+    args = parser.parse_args()
+    main(n_draws=args.draws, seed=args.seed, workers=args.workers)
@@ -0,0 +1,19 @@
+"""
+@name jr_totals.py
+@created October 2026
+"""
+
+import pandas as pd
+
+# the JR season summary sheet; JR has no per-match stat exports, only these season totals.
+# read by the pipeline (jr_allocation, jr_simulation) and the app (dashboard_aggregates)
+JR_TOTALS_PATH = "data/raw/junior/general.csv"
+JR_TOTALS_RENAME = {"tot_blks": "total_blocks"}
+JR_TOTAL_STATS = ["kills", "total_blocks", "digs", "aces"]
+
+def load_jr_totals(path=JR_TOTALS_PATH, stats=JR_TOTAL_STATS):
+    totals = pd.read_csv(path).rename(columns=JR_TOTALS_RENAME).iloc[0]
+    missing = [stat for stat in stats if stat not in totals]
+    if missing:
+        raise ValueError(f"{path}: missing season totals {missing}")
+    return {stat: int(totals[stat]) for stat in stats}
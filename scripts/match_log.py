@@ -0,0 +1,329 @@
+"""
+@name match_log.py
+@created October 2026
+"""
+
+import argparse
+import json
+import re
+from collections import Counter, defaultdict, deque
+
+import numpy as np
+import pandas as pd
+
+from add_advanced_tags import OUTPUT_PATH as ENRICHED_PATH, stats_high_fields
+from dates import normalize_dates
+from opponents import resolve_opponents, opponent_slugs, check_unmapped
+from records import RecordBook
+from schedule_cleaning import (
+    year_to_season, rival_opponents, forfeited_matches, sick_dates, injured_dates,
+    career_index_overrides, pvac_champs, dcsaa_champs, spikeout_champ_keys,
+    infer_match_type, importance_map, event_name_map, deaf_schools,
+    season_stages, career_stages,
+)
+from set_scores import parse_set_scores, last_set_margin
+from stats_merge import STAT_RENAME_MAP
+from time_windows import WORKLOAD_WINDOWS
+from typed_artifacts import write_typed
+
+PREVIOUS_SEASON = {"SO": "FR", "JR": "SO", "SR": "JR"}
+CHAMPIONSHIP_DATES = set(pd.to_datetime(pvac_champs + dcsaa_champs))
+CAREER_FIRST, CAREER_LAST = "first MSSD match", "last MSSD match"
+
+def _labels(flags, sep):
+    # joined flag strings as a list; NaN (an empty string after a CSV round trip) has none
+    return [] if pd.isna(flags) or flags == "" else flags.split(sep)
+
+class MatchLog:
+    """
+    The enriched dataset as an append-only log for adding matches mid-season.
+
+    Building the log is one pass over the existing rows. After that
+    `append_match` derives the new match's columns from running state (last
+    date, per-season and per-opponent counters, streaks, trailing workload
+    windows, record maxima, the career index) in O(1), and only touches the
+    earlier rows the new match actually changes: same-day counters, the
+    "last ... match" milestones it takes over, and highs it dethrones.
+    Season/career stages are quantiles over every row, so appends mark them
+    stale and `to_frame` recomputes them once.
+    """
+
+    def __init__(self, df):
+        df = df.reset_index(drop=True).copy()
+        df["date"] = pd.to_datetime(df["date"])
+        self.columns = list(df.columns)
+        self.rows = []
+        self.positions = {}
+        self.by_date = defaultdict(list)
+        self.day_opponent = Counter()
+        self.season_opponent = Counter()
+        self.last_result = {}
+        self.last_known_result = {}
+        self.season_rows = defaultdict(list)
+        self.streaks = {}
+        self.windows = defaultdict(deque)
+        self.last_career = None
+        self.stale_seasons = set()
+        self.career_stale = False
+        for row in df.to_dict("records"):
+            self._track(row)
+        self.records = RecordBook.from_frame(
+            df, stats_high_fields, eligible=df["did_play"].fillna(False).astype(bool) & df["stats_available"]
+        )
+
+    @classmethod
+    def load(cls, path=ENRICHED_PATH):
+        return cls(pd.read_csv(path))
+
+    def _track(self, row):
+        # fold one finished row into the running state
+        pos = len(self.rows)
+        self.rows.append(row)
+        self.positions[row["match_key"]] = pos
+        date, season, opponent = row["date"], row["season"], row["opponent"]
+        self.by_date[date].append(pos)
+        self.day_opponent[date, opponent] += 1
+        self.season_opponent[season, opponent] += 1
+        self.last_result[season, opponent] = row["result"]
+        if pd.notna(row["result"]):
+            self.last_known_result[season, opponent] = row["result"]
+        self.season_rows[season].append(pos)
+        self.streaks[season] = (row["win_streak"], row["loss_streak"])
+
+        window = self.windows[season]
+        window.append((date, 0 if pd.isna(row["set_count"]) else row["set_count"]))
+        while (date - window[0][0]).days >= max(WORKLOAD_WINDOWS):
+            window.popleft()
+        if pd.notna(row["career_match_index"]):
+            self.last_career = pos
+
+    def _set_milestone(self, pos, label, add=True):
+        row = self.rows[pos]
+        labels = [l for l in _labels(row["milestone_flag"], "; ") if l != label]
+        row["milestone_flag"] = "; ".join(labels + [label] if add else labels)
+
+    def _dethrone(self, holders, col):
+        # earlier holders of a broken record lose that field from their final highs
+        for field, keys in holders.items():
+            for key in keys:
+                row = self.rows[self.positions[key]]
+                row[col] = ";".join(f for f in _labels(row[col], ";") if f != field)
+                if col == "career_highs_flags":
+                    row["record_breaker_flag"] = row[col] != ""
+
+    def append_match(self, match, stats=None):
+        """
+        Add one match on or after the last logged date. `match` is a
+        master_schedule row (date, opponent, result, set_scores, set_result,
+        set_count, set_diff, location, is_conference, is_playoffs,
+        is_tournament, maxpreps; optionally forfeited/sick/injured), `stats`
+        its stat line keyed by the merged column names (raw stats_merge names
+        are renamed). Returns the new row as a dict.
+        """
+        row = {col: np.nan for col in self.columns}
+        row.update(match)
+
+        # same date/opponent/season rules as clean_schedule
+        date = normalize_dates(pd.Series([match.get("date")])).iat[0]
+        if pd.isna(date):
+            raise ValueError(f"Unparseable match date: {match.get('date')!r}")
+        if self.rows and date < self.rows[-1]["date"]:
+            raise ValueError(f"{date:%Y-%m-%d} is before the last logged match; the log is append-only")
+        opponent = resolve_opponents(pd.Series([match.get("opponent")])).iat[0]
+        slug = opponent_slugs(pd.Series([opponent])).iat[0]
+        check_unmapped(pd.DataFrame({"opponent": [opponent], "opponent_slug": [slug]}))
+        season = year_to_season.get(date.year)
+        if season is None:
+            raise ValueError(f"No season for {date:%Y-%m-%d}; add its year to year_to_season")
+        day = date.strftime("%Y-%m-%d")
+        result = match.get("result")
+        won, lost = result == "W", result == "L"
+        set_result = match.get("set_result")
+
+        # manual flags come from the schedule_cleaning lists unless the match sets them
+        forfeited = bool(match.get("forfeited", (day, opponent) in forfeited_matches))
+        sick = bool(match.get("sick", date in sick_dates))
+        injured = bool(match.get("injured", date in injured_dates))
+
+        same_day = self.by_date.get(date, [])
+        match_no = len(same_day) + 1
+        key_slug = re.sub(r"\W+", "", slug)
+        key = f"{season}_{date:%m-%d}_{key_slug}_{match_no}"
+        if key in self.positions:
+            raise ValueError(f"{key} is already in the log")
+        row.update({
+            "match_key": key, "date": date, "day_of_week": date.day_name(), "season": season,
+            "opponent": opponent, "opponent_slug": slug, "rivalry": slug in rival_opponents,
+            "deaf_school": slug in deaf_schools, "forfeited": forfeited, "sick": sick, "injured": injured,
+            "match_no": match_no, "total_matches_that_day": match_no, "multi_game_day": match_no > 1,
+            "first_match_of_day": False if match_no > 1 else np.nan,
+            "last_match_of_day": True if match_no > 1 else np.nan,
+            "same_day_opponent_seq": self.day_opponent[date, opponent] + 1,
+            "season_opponent_seq": self.season_opponent[season, opponent] + 1,
+            "is_repeat_opponent": self.season_opponent[season, opponent] > 0,
+            "is_championship": date in CHAMPIONSHIP_DATES or key in spikeout_champ_keys,
+            "event_name": event_name_map.get(day, np.nan),
+            "favorite_match": False, "highlight_match": False,
+            "birthday_match": date.strftime("%m-%d") == "09-21",
+        })
+        row["match_type"] = infer_match_type(row)
+        row["game_importance"], row["game_importance_score"] = importance_map.get(row["match_type"], ("low", 0))
+
+        # storylines against earlier results
+        row["revenge_match"] = self.last_result.get((season, opponent)) == "L" and won
+        row["redemption_game"] = self.last_known_result.get((PREVIOUS_SEASON.get(season), opponent)) == "L" and won
+
+        # set scores: same parse as the set table, one match at a time
+        set_scores = match.get("set_scores")
+        pts_for, pts_against, n_sets = parse_set_scores([set_scores])
+        points_for, points_against = (int(pts_for.sum()), int(pts_against.sum())) if n_sets[0] else (0, 0)
+        margin = (points_for - points_against) / (points_for + points_against) if points_for + points_against else np.nan
+        tight_final_set = abs(last_set_margin(pts_for, pts_against, n_sets)[0]) == 2
+        row.update({
+            "set_scores": "" if pd.isna(set_scores) else str(set_scores),
+            "comeback_win": bool(n_sets[0]) and pts_for[0, 0] <= pts_against[0, 0] and won,
+            "total_points_for": points_for, "total_points_against": points_against, "margin_pct": margin,
+            "high_margin_win": won and margin >= 0.6, "low_margin_loss": lost and margin >= -0.1,
+            "was_set_swept": set_result in ("0-3", "0-2"), "swept_opponent": set_result in ("3-0", "2-0"),
+            "deciding_set_played": set_result in ("2-1", "1-2", "3-2", "2-3"),
+        })
+
+        # career index and schedule position
+        counted = not (forfeited or injured or sick) or key in career_index_overrides
+        previous_career = self.last_career
+        last_index = 0 if previous_career is None else int(self.rows[previous_career]["career_match_index"])
+        season_rows = self.season_rows.get(season, [])
+        season_start = self.rows[season_rows[0]]["date"] if season_rows else date
+        days_since = (date - self.rows[-1]["date"]).days if self.rows else 0
+        row.update({
+            "career_match_index": last_index + 1 if counted else np.nan, "did_play": counted,
+            "season_match_number": len(season_rows) + 1,
+            "week_of_season": (date - season_start).days // 7 + 1,
+            "days_since_last_match": days_since, "is_back_to_back": days_since == 1,
+        })
+
+        # trailing workload windows (per season, this match included)
+        sets = 0 if pd.isna(match.get("set_count")) else match["set_count"]
+        window = self.windows.get(season, ())
+        for w in WORKLOAD_WINDOWS:
+            recent = [s for d, s in window if (date - d).days < w]
+            row[f"match_density_{w}days"] = len(recent) + 1
+            row[f"set_density_{w}days"] = sum(recent) + sets
+
+        # streaks carry on from the season's previous match; prev_* from the previous match overall
+        wins, losses = self.streaks.get(season, (0, 0))
+        previous = self.rows[-1] if self.rows else {}
+        row.update({
+            "win_streak": wins + 1 if won else 0, "loss_streak": losses + 1 if lost else 0,
+            "prev_result": previous.get("result", np.nan),
+            "prev_win_streak": previous.get("win_streak", np.nan),
+            "prev_loss_streak": previous.get("loss_streak", np.nan),
+        })
+
+        # stat line
+        row.update({STAT_RENAME_MAP.get(col, col): value for col, value in (stats or {}).items()})
+        errors = [row.get(c) for c in ["serve_errors", "kill_errors", "receiving_errors"]]
+        row.update({
+            "stats_available": season != "JR",
+            "played_all_sets": counted and row.get("sets_played") == match.get("set_count"),
+            "low_error_game": not any(pd.isna(e) for e in errors) and sum(errors) <= 2,
+            "deciding_set_win": counted and won and set_result in ("2-1", "3-2") and tight_final_set,
+            "deciding_set_loss": counted and lost and set_result in ("1-2", "2-3") and tight_final_set,
+        })
+
+        # highs: the newest match's highs at the time are also its final highs
+        season_flags = career_flags = ""
+        if counted and season != "JR":
+            records = self.records.append(key, season, {f: row.get(f) for f in stats_high_fields})
+            season_flags = ";".join(records["season_highs_at_time"])
+            career_flags = ";".join(records["career_highs_at_time"])
+            self._dethrone(records["season_dethroned"], "season_highs_flags")
+            self._dethrone(records["career_dethroned"], "career_highs_flags")
+        row.update({
+            "season_highs_flags": season_flags, "season_highs_at_time_flags": season_flags,
+            "career_highs_flags": career_flags, "career_highs_at_time_flags": career_flags,
+            "record_breaker_flag": career_flags != "",
+            "milestone_flag": "", "season_stage": np.nan, "career_stage": np.nan,
+        })
+        row = {col: row[col] for col in self.columns}
+
+        # earlier matches that day: counters, first/last flags and their trailing windows
+        for pos in same_day:
+            earlier = self.rows[pos]
+            earlier["total_matches_that_day"] = match_no
+            earlier["multi_game_day"] = True
+            earlier["first_match_of_day"] = earlier["match_no"] == 1
+            earlier["last_match_of_day"] = False
+            for w in WORKLOAD_WINDOWS:
+                if f"match_density_{w}days" in earlier:
+                    earlier[f"match_density_{w}days"] += 1
+                    earlier[f"set_density_{w}days"] += sets
+
+        # milestones: the newest match takes over "last <season>" and "last MSSD" from their holders
+        previous_season_row = season_rows[-1] if season_rows else None
+        self._track(row)
+        pos = self.positions[key]
+        if counted and previous_career is None:
+            self._set_milestone(pos, CAREER_FIRST)
+        if previous_season_row is None:
+            self._set_milestone(pos, f"first {season} match")
+        else:
+            self._set_milestone(previous_season_row, f"last {season} match", add=False)
+        self._set_milestone(pos, f"last {season} match")
+        if counted:
+            if previous_career is not None:
+                self._set_milestone(previous_career, CAREER_LAST, add=False)
+            self._set_milestone(pos, CAREER_LAST)
+
+        # stages are quantiles over the season/career: recomputed on the next to_frame
+        self.stale_seasons.add(season)
+        self.career_stale = self.career_stale or counted
+        return row
+
+    def refresh_stages(self):
+        # the only full recompute: season thirds for the seasons that grew, career quarters if it grew
+        for season in self.stale_seasons:
+            positions = self.season_rows[season]
+            numbers = pd.Series([self.rows[p]["season_match_number"] for p in positions])
+            if len(numbers) > 1:
+                stages = season_stages(numbers, pd.Series(season, index=numbers.index))
+            else:
+                stages = ["early"]  # qcut needs two distinct values
+            for p, stage in zip(positions, stages):
+                self.rows[p]["season_stage"] = stage
+        if self.career_stale:
+            index = pd.Series([row["career_match_index"] for row in self.rows], dtype="float64")
+            for row, stage in zip(self.rows, career_stages(index)):
+                row["career_stage"] = stage
+        self.stale_seasons = set()
+        self.career_stale = False
+
+    def to_frame(self):
+        self.refresh_stages()
+        return pd.DataFrame.from_records(self.rows, columns=self.columns)
+
+    def save(self, path=ENRICHED_PATH):
+        df = self.to_frame()
+        df.to_csv(path, index=False)
+        write_typed(df, path)
+        return df
+
+def main(matches_path, input_path=ENRICHED_PATH, output_path=ENRICHED_PATH):
+    # matches_path: JSON list of {"match": {...master_schedule row...}, "stats": {...}}
+    with open(matches_path) as f:
+        entries = json.load(f)
+    log = MatchLog.load(input_path)
+    for entry in entries:
+        row = log.append_match(entry["match"], entry.get("stats"))
+        print(f"➕ {row['match_key']}")
+    log.save(output_path)
+    print(f"✅ Appended {len(entries)} match(es) to {output_path}")
+    return log
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Append new matches to the enriched dataset without a full rebuild.")
+    parser.add_argument("matches", help='JSON list of {"match": {...}, "stats": {...}} entries, in date order')
+    parser.add_argument("--input", default=ENRICHED_PATH)
+    parser.add_argument("--output", default=ENRICHED_PATH)
+    args = parser.parse_args()
+    main(args.matches, args.input, args.output)
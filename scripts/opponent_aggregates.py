@@ -0,0 +1,128 @@
+"""
+@name opponent_aggregates.py
+@created October 2026
+"""
+
+import os
+
+import pandas as pd
+
+from add_advanced_tags import OUTPUT_PATH as INPUT_PATH
+from typed_artifacts import SEASON_DTYPE, read_stage_csv, write_typed
+from instrumentation import step, run_report
+
+OUTPUT_PATH = "data/NEW_opponent_head_to_head.csv"
+
+# counting stats summed per opponent; only matches with a stat line count (JR rows are placeholders)
+SUM_STATS = [
+    "kills", "kill_attempts", "kill_errors",
+    "assists", "ball_handling_attempts", "ball_handling_errors",
+    "solo_blocks", "assisted_blocks", "total_blocks", "block_errors",
+    "digs", "dig_errors",
+    "receiving", "receiving_errors",
+    "aces", "serve_attempts", "serve_errors", "points",
+]
+PER_SET_STATS = {
+    "kills_per_set": "kills",
+    "assists_per_set": "assists",
+    "blocks_per_set": "total_blocks",
+    "digs_per_set": "digs",
+    "receiving_per_set": "receiving",
+    "aces_per_set": "aces",
+}
+
+# built-in reducers only, so every aggregation runs in pandas' grouped kernels
+AGGREGATIONS = {
+    "opponent_slug": ("opponent_slug", "first"),
+    "games_played": ("result", "size"),
+    "wins": ("win", "sum"),
+    "losses": ("loss", "sum"),
+    "ties": ("tie", "sum"),
+    "set_diff": ("set_diff", "sum"),
+    "points_for": ("total_points_for", "sum"),
+    "points_against": ("total_points_against", "sum"),
+    "stat_games": ("stat_sets", "count"),
+    "stat_sets": ("stat_sets", "sum"),
+    **{stat: (stat, "sum") for stat in SUM_STATS},
+}
+
+def ratio(numerator, denominator):
+    # NaN rather than inf/0 when there's nothing to divide by
+    return numerator / denominator.where(denominator > 0)
+
+def prepare(df):
+    # one numeric column per aggregated quantity, stats blanked where the match has no stat line
+    has_stats = df["stats_available"].astype(bool)
+    result = df["result"].astype(str)
+    out = pd.DataFrame({
+        "opponent": df["opponent"].astype(str).str.strip(),
+        "opponent_slug": df["opponent_slug"].astype(str),
+        "season": df["season"].astype(str).astype(SEASON_DTYPE),
+        "result": result,
+        "win": (result == "W").astype(int),
+        "loss": (result == "L").astype(int),
+        "tie": (result == "T").astype(int),
+        "set_diff": pd.to_numeric(df["set_diff"]),
+        "total_points_for": pd.to_numeric(df["total_points_for"]),
+        "total_points_against": pd.to_numeric(df["total_points_against"]),
+        "stat_sets": pd.to_numeric(df["sets_played"]).where(has_stats),
+    })
+    for stat in SUM_STATS:
+        out[stat] = pd.to_numeric(df[stat]).where(has_stats)
+    return out
+
+def add_rates(table):
+    # rates from the summed counts (a ratio of sums), never an average of per-match rates
+    stat_games = table["stat_games"]
+    table[SUM_STATS + ["stat_sets"]] = table[SUM_STATS + ["stat_sets"]].where(stat_games > 0).astype("Int64")
+    games = table["games_played"]
+    table["win_rate"] = ratio(table["wins"], games)
+    table["avg_set_diff"] = ratio(table["set_diff"], games)
+    table["avg_points_for"] = ratio(table["points_for"], games)
+    table["avg_points_against"] = ratio(table["points_against"], games)
+    table["point_share"] = ratio(table["points_for"], table["points_for"] + table["points_against"])
+
+    sums = table[SUM_STATS + ["stat_sets"]].astype(float)
+    table["hit_pct"] = ratio(sums["kills"] - sums["kill_errors"], sums["kill_attempts"])
+    table["kill_pct"] = 100 * ratio(sums["kills"], sums["kill_attempts"])
+    table["ace_pct"] = 100 * ratio(sums["aces"], sums["serve_attempts"])
+    table["serve_pct"] = 100 * ratio(sums["serve_attempts"] - sums["serve_errors"], sums["serve_attempts"])
+    for rate, stat in PER_SET_STATS.items():
+        table[rate] = ratio(sums[stat], sums["stat_sets"])
+    return table
+
+def opponent_head_to_head(df):
+    """
+    One row per (opponent, season) plus one career row per opponent (season
+    is NA): games, W/L/T, set diff, points for/against, summed counting stats
+    and rate stats computed from those sums. Two grouped passes over the
+    matches; no per-group Python.
+    """
+    with step("head_to_head/prepare", rows_in=len(df)):
+        prepared = prepare(df)
+
+    with step("head_to_head/aggregate") as rec:
+        by_season = prepared.groupby(["opponent", "season"], observed=True, sort=True).agg(**AGGREGATIONS)
+        career = prepared.groupby("opponent", sort=True).agg(**AGGREGATIONS)
+        career["season"] = pd.Series(pd.NA, index=career.index, dtype=SEASON_DTYPE)
+        career = career.set_index("season", append=True)
+        # career row first, then the seasons in order
+        table = pd.concat([career, by_season]).reset_index()
+        table["_season_order"] = table["season"].cat.codes
+        table = table.sort_values(["opponent", "_season_order"], kind="mergesort").drop(columns="_season_order")
+        rec.rows_out = len(table)
+
+    with step("head_to_head/rates"):
+        table = add_rates(table.reset_index(drop=True))
+    return table
+
+def main(input_path=INPUT_PATH, output_path=OUTPUT_PATH):
+    table = opponent_head_to_head(read_stage_csv(input_path))
+    table.to_csv(output_path, index=False)
+    write_typed(table, output_path)
+    print(f"✅ Aggregated {table['opponent'].nunique()} opponents into {len(table)} head-to-head rows: {os.path.basename(output_path)}")
+    return table
+
+if __name__ == "__main__":
+    with run_report("head_to_head"):
+        main()
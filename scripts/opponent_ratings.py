@@ -0,0 +1,206 @@
+"""
+@name opponent_ratings.py
+@created October 2026
+"""
+
+import argparse
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from schedule_cleaning import OUTPUT_PATH as INPUT_PATH
+from typed_artifacts import read_stage_csv
+
+RATINGS_PATH = "data/NEW_opponent_ratings.csv"
+MATCH_RATINGS_PATH = "data/NEW_match_ratings.csv"
+
+TEAM = "MSSD"
+BASE_RATING = 1500.0
+K_FACTOR = 32.0
+POINT_WEIGHT = 0.5  # share of the match score taken from point share (the rest from set share)
+HOME_ADVANTAGE = {"home": 50.0, "away": -50.0, "neutral": 0.0}
+BT_PRIOR = 0.1  # L2 pull toward the mean for the batch Bradley-Terry fit
+
+def match_scores(sets_won, sets_lost, points_for, points_against, point_weight=POINT_WEIGHT):
+    """
+    Match score in [0, 1] for the first team: a blend of set share and point
+    share, so a 3-2 squeaker moves ratings less than a 3-0 rout.
+    Vectorized; works on scalars, arrays or Series.
+    """
+    sets_won, sets_lost = np.asarray(sets_won, dtype=float), np.asarray(sets_lost, dtype=float)
+    points_for, points_against = np.asarray(points_for, dtype=float), np.asarray(points_against, dtype=float)
+    set_share = np.divide(sets_won, sets_won + sets_lost, out=np.full_like(sets_won, 0.5), where=(sets_won + sets_lost) > 0)
+    point_share = np.divide(points_for, points_for + points_against, out=set_share.copy(), where=(points_for + points_against) > 0)
+    return (1 - point_weight) * set_share + point_weight * point_share
+
+def expected_score(rating_a, rating_b, advantage=0.0):
+    return 1.0 / (1.0 + 10.0 ** (-(rating_a - rating_b + advantage) / 400.0))
+
+class EloRatings:
+    """
+    Running Elo ratings for any number of teams. `update` is O(1): one
+    expected-score evaluation and two dict writes per match.
+    """
+
+    def __init__(self, k=K_FACTOR, base=BASE_RATING, home_advantage=HOME_ADVANTAGE):
+        self.k = k
+        self.base = base
+        self.home_advantage = home_advantage
+        self.ratings = {}
+        self.matches = {}
+
+    def rating(self, team):
+        return self.ratings.get(team, self.base)
+
+    def update(self, team, opponent, score, location="neutral"):
+        """
+        Apply one result (`score` in [0, 1] for `team`). Returns the pre-match
+        ratings and the expected score, i.e. what a forecast would have used.
+        """
+        r_team, r_opp = self.rating(team), self.rating(opponent)
+        expected = expected_score(r_team, r_opp, self.home_advantage.get(location, 0.0))
+        delta = self.k * (score - expected)
+        self.ratings[team] = r_team + delta
+        self.ratings[opponent] = r_opp - delta
+        for t in (team, opponent):
+            self.matches[t] = self.matches.get(t, 0) + 1
+        return r_team, r_opp, expected
+
+def prepare_schedule(df, team=TEAM, point_weight=POINT_WEIGHT):
+    """
+    Rateable matches in date order with the columns the rating code needs.
+    Forfeits and matches without a set result carry no strength signal.
+    """
+    df = df[~df["forfeited"].fillna(False).astype(bool) & df["set_result"].notna()]
+    df = df.sort_values(["date", "match_no"], kind="mergesort").reset_index(drop=True)
+    sets = df["set_result"].str.extract(r"^\s*(\d+)\s*-\s*(\d+)\s*$").astype(float)
+    return pd.DataFrame({
+        "match_key": df["match_key"],
+        "date": df["date"],
+        "team": df["team"] if "team" in df.columns else team,
+        "opponent_slug": df["opponent_slug"],
+        "opponent": df["opponent"],
+        "location": df["location"].fillna("neutral"),
+        "sets_won": sets[0],
+        "sets_lost": sets[1],
+        "points_for": df["total_points_for"],
+        "points_against": df["total_points_against"],
+        "score": match_scores(sets[0], sets[1], df["total_points_for"], df["total_points_against"], point_weight),
+    })
+
+def run_elo(matches, k=K_FACTOR, home_advantage=HOME_ADVANTAGE):
+    # replay the schedule through the incremental engine; returns (engine, per-match pre-match ratings)
+    elo = EloRatings(k=k, home_advantage=home_advantage)
+    history = [
+        elo.update(team, opp, score, loc)
+        for team, opp, score, loc in matches[["team", "opponent_slug", "score", "location"]].itertuples(index=False)
+    ]
+    pre = pd.DataFrame(history, columns=["team_rating_pre", "opponent_rating_pre", "expected_score"])
+    return elo, pd.concat([matches[["match_key", "opponent_slug", "score"]], pre], axis=1)
+
+def elo_grid(team_idx, opp_idx, scores, advantage, k_values, n_teams, base=BASE_RATING):
+    """
+    Elo replayed for P parameter sets at once: ratings are a (P, teams)
+    array, so each match is a handful of NumPy ops however many settings
+    are being back-tested. `scores` is (P, matches) so point weights can vary
+    too; `k_values` and `advantage` scale are (P,).
+    Returns the (P, matches) expected scores made before each match.
+    """
+    P, M = scores.shape
+    ratings = np.full((P, n_teams), base)
+    expected = np.empty((P, M))
+    rows = np.arange(P)
+    for m in range(M):
+        a, b = team_idx[m], opp_idx[m]
+        e = expected_score(ratings[rows, a], ratings[rows, b], advantage[:, m])
+        delta = k_values * (scores[:, m] - e)
+        ratings[rows, a] += delta
+        ratings[rows, b] -= delta
+        expected[:, m] = e
+    return expected
+
+def backtest(matches, k_values=(16, 24, 32, 48), point_weights=(0.0, 0.25, 0.5, 0.75), home_scales=(0.0, 1.0)):
+    """
+    Score every (k, point_weight, home_scale) combination by how well its
+    pre-match expected score predicted the actual match score (Brier) and the
+    win/loss outcome (log loss). Returns one row per combination, best first.
+    """
+    codes, teams = pd.factorize(pd.concat([matches["team"], matches["opponent_slug"]]))
+    team_idx, opp_idx = codes[:len(matches)], codes[len(matches):]
+    base_adv = matches["location"].map(HOME_ADVANTAGE).fillna(0.0).to_numpy()
+
+    grid = list(itertools.product(k_values, point_weights, home_scales))
+    k_arr = np.array([g[0] for g in grid], dtype=float)
+    scores = np.stack([
+        match_scores(matches["sets_won"], matches["sets_lost"], matches["points_for"], matches["points_against"], w)
+        for _, w, _ in grid
+    ])
+    advantage = np.array([g[2] for g in grid])[:, None] * base_adv[None, :]
+
+    expected = elo_grid(team_idx, opp_idx, scores, advantage, k_arr, len(teams))
+    won = (matches["sets_won"] > matches["sets_lost"]).to_numpy(dtype=float)
+    clipped = np.clip(expected, 1e-6, 1 - 1e-6)
+    out = pd.DataFrame(grid, columns=["k", "point_weight", "home_scale"])
+    out["brier"] = ((expected - scores) ** 2).mean(axis=1)
+    out["log_loss"] = -(won * np.log(clipped) + (1 - won) * np.log(1 - clipped)).mean(axis=1)
+    return out.sort_values("log_loss", kind="mergesort").reset_index(drop=True)
+
+def bradley_terry(matches, prior=BT_PRIOR, iterations=500, lr=0.5):
+    """
+    Batch Bradley-Terry refit over all history: strengths maximizing
+    sum(score * log p + (1 - score) * log(1 - p)) with p = sigmoid(s_team - s_opp),
+    plus an L2 prior. Full-batch gradient ascent with np.bincount, so each
+    iteration is O(matches + teams). Returned on the Elo scale (400 / ln 10).
+    """
+    codes, teams = pd.factorize(pd.concat([matches["team"], matches["opponent_slug"]]))
+    a, b = codes[:len(matches)], codes[len(matches):]
+    score = matches["score"].to_numpy(dtype=float)
+    n = len(teams)
+    counts = np.bincount(a, minlength=n) + np.bincount(b, minlength=n)
+
+    strength = np.zeros(n)
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(strength[a] - strength[b])))
+        resid = score - p
+        grad = np.bincount(a, resid, minlength=n) - np.bincount(b, resid, minlength=n) - prior * strength
+        strength += lr * grad / np.maximum(counts, 1)
+        strength -= strength.mean()
+    return pd.Series(BASE_RATING + strength * 400.0 / np.log(10.0), index=teams, name="bt_rating")
+
+def rate_opponents(df, team=TEAM, k=K_FACTOR, point_weight=POINT_WEIGHT):
+    """
+    Final Elo and Bradley-Terry ratings per opponent plus the pre-match
+    ratings for every rated match. Returns (ratings table, per-match ratings).
+    """
+    matches = prepare_schedule(df, team, point_weight)
+    elo, per_match = run_elo(matches, k)
+    bt = bradley_terry(matches)
+
+    names = matches.drop_duplicates("opponent_slug", keep="last").set_index("opponent_slug")["opponent"]
+    opponents = names.index
+    ratings = pd.DataFrame({
+        "opponent_slug": opponents,
+        "opponent": names.to_numpy(),
+        "elo": [elo.rating(o) for o in opponents],
+        "bt_rating": bt.reindex(opponents).to_numpy(),
+        "matches": [elo.matches[o] for o in opponents],
+    }).sort_values("elo", ascending=False, kind="mergesort").reset_index(drop=True)
+    return ratings, per_match
+
+def main(input_path=INPUT_PATH, ratings_path=RATINGS_PATH, match_ratings_path=MATCH_RATINGS_PATH):
+    df = read_stage_csv(input_path)
+    ratings, per_match = rate_opponents(df)
+    ratings.to_csv(ratings_path, index=False)
+    per_match.to_csv(match_ratings_path, index=False)
+    print(f"✅ Rated {len(ratings)} opponents over {len(per_match)} matches")
+    return ratings, per_match
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rate opponent strength from the cleaned schedule.")
+    parser.add_argument("--backtest", action="store_true", help="score a grid of rating parameters instead")
+    args = parser.parse_args()
+    if args.backtest:
+        print(backtest(prepare_schedule(pd.read_csv(INPUT_PATH))).to_string(index=False))
+    else:
+        main()
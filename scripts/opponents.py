@@ -0,0 +1,133 @@
+"""
+@name opponents.py
+@created October 2026
+"""
+
+import difflib
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+# canonical opponent name -> slug (single source of truth for every script)
+OPPONENT_SLUGS = {
+    "Alabama School for the Deaf": "AIDB",
+    "Atlanta Area School for the Deaf": "AASD",
+    "Barrie": "BARRIE",
+    "Bell": "BELL",
+    "Berman Hebrew Academy": "BHA",
+    "Bishop Ireton": "BIHS",
+    "Bishop O'Connell": "BOHS",
+    "Brookewood": "BW",
+    "Bullis": "BULLIS",
+    "Burke": "BURKE",
+    "California School for the Deaf": "CSDF",
+    "California School for the Deaf-Riverside": "CSDR",
+    "Clinton Grace Christian": "CGC",
+    "Connelly School of the Holy Child": "CSHC",
+    "Covenant Life": "CL",
+    "DC International": "DCI",
+    "E.L. Haynes": "HAYNES",
+    "Episcopal": "EPISCOPAL",
+    "Field": "FIELD",
+    "Florida School for the Deaf & Blind": "FSDB",
+    "Fredericksburg Christian": "FCHS",
+    "Friends": "FRIENDS",
+    "Georgetown Day": "GTD",
+    "Grace Christian": "GC",
+    "Grace Christian Academy": "GCA",
+    "Highland": "HIGHLAND",
+    "Indiana School for the Deaf": "ISD",
+    "Interlachen": "INTERLACHEN",
+    "Islamic Saudi Academy": "ISA",
+    "King Abdullah Academy": "KAA",
+    "Maret": "MARET",
+    "Maryland School for the Deaf": "MSD",
+    "McLean": "MCLEAN",
+    "Mississippi School for the Deaf": "MISD",
+    "Mount Airy Christian Academy": "MACA",
+    "New Life Christian School": "NL",
+    "Oakcrest": "OAKCREST",
+    "Pallotti": "PALLOTTI",
+    "Parkside": "PARKSIDE",
+    "Princess Anne": "PA",
+    "River City Science Academy": "RCSA",
+    "Riverdale Baptist": "RB",
+    "Roosevelt": "ROOSEVELT",
+    "Sandy Spring Friends": "SSFS",
+    "School Without Walls": "SWW",
+    "Seton School": "SETON",
+    "Shalom Christian Academy": "SCA",
+    "Sidwell Friends": "SIDWELL",
+    "Smith Jewish Day School": "SJDS",
+    "Spencerville Adventist Academy": "SAA",
+    "St. John's": "SJ",
+    "St. John's Catholic Prep": "SJCP",
+    "Stone Ridge School of the Sacred Heart": "SRSSH",
+    "StoneBridge": "SB",
+    "Takoma Academy": "TA",
+    "Texas School for the Deaf": "TSD",
+    "Varsity Opponent": "VO",
+    "Washington Christian Academy": "WCA",
+    "Washington International": "WIS",
+    "Woodrow Wilson": "WILSON",
+}
+
+# renamed schools / alternate spellings -> canonical name
+OPPONENT_ALIASES = {
+    "Jackson-Reed": "Woodrow Wilson",
+}
+
+FUZZY_CUTOFF = 0.88
+
+def _normalize(name):
+    return re.sub(r"[^a-z0-9]+", " ", str(name).lower()).strip()
+
+_NORMALIZED_LOOKUP = {_normalize(name): name for name in OPPONENT_SLUGS}
+_NORMALIZED_LOOKUP.update({_normalize(alias): name for alias, name in OPPONENT_ALIASES.items()})
+
+@lru_cache(maxsize=None)
+def canonical_opponent(name):
+    # exact -> alias -> normalized -> fuzzy; None when nothing is close enough
+    if name in OPPONENT_SLUGS:
+        return name
+    if name in OPPONENT_ALIASES:
+        return OPPONENT_ALIASES[name]
+    key = _normalize(name)
+    if key in _NORMALIZED_LOOKUP:
+        return _NORMALIZED_LOOKUP[key]
+    match = difflib.get_close_matches(key, list(_NORMALIZED_LOOKUP), n=1, cutoff=FUZZY_CUTOFF)
+    if match:
+        resolved = _NORMALIZED_LOOKUP[match[0]]
+        print(f"⚠️ Fuzzy-matched opponent '{name}' -> '{resolved}'")
+        return resolved
+    return None
+
+def _map_unique(series, func):
+    # resolve each distinct name once, then broadcast back over the column
+    series = pd.Series(series)
+    codes, uniques = pd.factorize(series)
+    resolved = pd.Series([func(name) for name in uniques], dtype=object)
+    out = resolved.reindex(codes).to_numpy()  # code -1 (missing) -> NaN
+    return pd.Series(out, index=series.index, dtype=object)
+
+def resolve_opponents(series):
+    """Canonical names for a whole column; unresolvable names are kept as-is."""
+    series = pd.Series(series)
+    resolved = _map_unique(series, canonical_opponent)
+    return resolved.fillna(series)
+
+def opponent_slugs(series):
+    """Slugs for a whole column; NaN where the opponent isn't in the registry."""
+    return _map_unique(series, lambda name: OPPONENT_SLUGS.get(canonical_opponent(name)))
+
+def get_opponent_slug(opponent):
+    return OPPONENT_SLUGS.get(canonical_opponent(opponent))
+
+def check_unmapped(df, opponent_col="opponent", slug_col="opponent_slug"):
+    unmapped = df[df[slug_col].isnull()][opponent_col].dropna().unique()
+    if len(unmapped) > 0:
+        print("WARNING: Unmapped opponents found. Please update OPPONENT_SLUGS in opponents.py:")
+        for opponent in unmapped:
+            print(f'    "{opponent}": "",')
+        raise ValueError("STOP: unmapped opponents need to be filled in.")
@@ -0,0 +1,315 @@
+"""
+@name pipeline.py
+@created October 2026
+"""
+
+import argparse
+import json
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+
+import schedule_cleaning
+import stats_merge
+import final_merge
+import add_advanced_tags
+import jr_allocation
+import jr_simulation
+import opponent_ratings
+import opponent_aggregates
+import artifact_cache
+from instrumentation import step, run_report
+from hashing import file_hash
+from typed_artifacts import as_csv_types, typed_path, write_typed
+
+STATE_PATH = "data/.pipeline_state.json"
+CODE_KEY = "__code__"
+
+@dataclass
+class Stage:
+    name: str
+    inputs: list
+    outputs: list
+    run: object  # run(changed_inputs) -> None; changed_inputs is None for a full rebuild
+    code: tuple = ()  # modules whose source (plus local imports) versions the stage
+
+def load_state(state_path=STATE_PATH):
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path) as f:
+        return json.load(f)
+
+def save_state(state, state_path=STATE_PATH):
+    with open(state_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+# --------------------------------------------------------------
+# stages
+# --------------------------------------------------------------
+def season_stat_outputs():
+    return [
+        stats_merge.season_output_path(season_folder)
+        for season_folder in stats_merge.SEASON_YEAR_MAP
+        if any(os.path.exists(p) for p in stats_merge.season_input_paths(season_folder))
+    ]
+
+def season_stat_inputs():
+    return [
+        path
+        for season_folder in stats_merge.SEASON_YEAR_MAP
+        for path in stats_merge.season_input_paths(season_folder)
+        if os.path.exists(path)
+    ]
+
+def run_clean_schedule(changed):
+    # career-level features (career index, qcut stages) span seasons, so this stage is all-or-nothing
+    schedule_cleaning.main()
+
+def run_merge_stats(changed, workers=1):
+    seasons = []
+    for season_folder in stats_merge.SEASON_YEAR_MAP:
+        raw_paths = [p for p in stats_merge.season_input_paths(season_folder) if os.path.exists(p)]
+        if not raw_paths:
+            continue
+        stale = (
+            changed is None
+            or not os.path.exists(stats_merge.season_output_path(season_folder))
+            or any(p in changed for p in raw_paths)
+        )
+        if stale:
+            seasons.append(season_folder)
+        else:
+            print(f"⏭️  {season_folder}: unchanged, reusing {stats_merge.season_output_path(season_folder)}")
+    stats_merge.merge_stats(seasons=seasons, workers=workers)
+
+def run_final_merge(changed):
+    final_merge.main()
+
+def run_enrich(changed):
+    add_advanced_tags.main()
+
+def run_allocate_jr(changed):
+    jr_allocation.main()
+
+def run_simulate_jr(changed, workers):
+    jr_simulation.main(workers=workers)
+
+def run_rate_opponents(changed):
+    opponent_ratings.main()
+
+def run_head_to_head(changed):
+    opponent_aggregates.main()
+
+def build_stages(workers=1):
+    return [
+        Stage(
+            name="clean_schedule",
+            inputs=[schedule_cleaning.SCHEDULE_PATH],
+            outputs=[schedule_cleaning.OUTPUT_PATH, typed_path(schedule_cleaning.OUTPUT_PATH), schedule_cleaning.SETS_OUTPUT_PATH],
+            run=run_clean_schedule,
+            code=(schedule_cleaning,),
+        ),
+        Stage(
+            name="merge_stats",
+            inputs=season_stat_inputs() + [stats_merge.JUNIOR_SCHEDULE_PATH],
+            outputs=[stats_merge.STATS_OUTPUT_PATH, typed_path(stats_merge.STATS_OUTPUT_PATH)] + season_stat_outputs(),
+            run=lambda changed: run_merge_stats(changed, workers=workers),
+            code=(stats_merge,),
+        ),
+        Stage(
+            name="final_merge",
+            inputs=[final_merge.SCHEDULE_PATH, final_merge.STATS_PATH],
+            outputs=[final_merge.OUTPUT_PATH, typed_path(final_merge.OUTPUT_PATH)],
+            run=run_final_merge,
+            code=(final_merge,),
+        ),
+        Stage(
+            name="enrich",
+            inputs=[add_advanced_tags.INPUT_PATH, add_advanced_tags.SETS_PATH],
+            outputs=[add_advanced_tags.OUTPUT_PATH, typed_path(add_advanced_tags.OUTPUT_PATH)],
+            run=run_enrich,
+            code=(add_advanced_tags,),
+        ),
+        Stage(
+            name="allocate_jr",
+            inputs=[jr_allocation.INPUT_PATH, jr_allocation.JR_TOTALS_PATH],
+            outputs=[jr_allocation.OUTPUT_PATH, typed_path(jr_allocation.OUTPUT_PATH)],
+            run=run_allocate_jr,
+            code=(jr_allocation,),
+        ),
+        Stage(
+            name="simulate_jr",
+            inputs=[jr_allocation.INPUT_PATH, jr_allocation.JR_TOTALS_PATH],
+            outputs=[
+                jr_simulation.MATCH_BANDS_PATH, typed_path(jr_simulation.MATCH_BANDS_PATH),
+                jr_simulation.SEASON_BANDS_PATH,
+            ],
+            run=lambda changed: run_simulate_jr(changed, workers=workers),
+            code=(jr_simulation,),
+        ),
+        Stage(
+            name="rate_opponents",
+            inputs=[opponent_ratings.INPUT_PATH],
+            outputs=[opponent_ratings.RATINGS_PATH, opponent_ratings.MATCH_RATINGS_PATH],
+            run=run_rate_opponents,
+            code=(opponent_ratings,),
+        ),
+        Stage(
+            name="head_to_head",
+            inputs=[opponent_aggregates.INPUT_PATH],
+            outputs=[opponent_aggregates.OUTPUT_PATH, typed_path(opponent_aggregates.OUTPUT_PATH)],
+            run=run_head_to_head,
+            code=(opponent_aggregates,),
+        ),
+    ]
+
+
+# --------------------------------------------------------------
+# runner
+# --------------------------------------------------------------
+def run_pipeline(stages=None, force=False, state_path=STATE_PATH, workers=1, use_cache=True,
+                 cache_dir=artifact_cache.CACHE_DIR, max_cache_bytes=artifact_cache.MAX_CACHE_BYTES,
+                 max_cache_age_days=artifact_cache.MAX_CACHE_AGE_DAYS):
+    # a stage reruns when any input hash or its code version moved, or an output is missing;
+    # since each stage's outputs are the next one's inputs, changes cascade only as far as they matter.
+    # outputs are also stored in a content-addressed cache keyed by (inputs, code), so a stage
+    # whose key was seen before restores its outputs instead of recomputing them
+    stages = stages if stages is not None else build_stages(workers=workers)
+    state = load_state(state_path)
+    ran = []
+
+    for stage in stages:
+        previous = state.get(stage.name, {})
+        hashes = {path: file_hash(path) for path in stage.inputs}
+        code = artifact_cache.code_version(*stage.code) if stage.code else ""
+        changed = {path for path, h in hashes.items() if previous.get(path) != h}
+        code_changed = previous.get(CODE_KEY) != code
+        missing_outputs = [path for path in stage.outputs if not os.path.exists(path)]
+
+        if not force and not changed and not code_changed and not missing_outputs:
+            print(f"⏭️  {stage.name}: up to date")
+            continue
+
+        key = artifact_cache.cache_key(stage.name, hashes, code)
+        if use_cache and not force and artifact_cache.restore(key, cache_dir):
+            print(f"♻️  {stage.name}: restored outputs from cache ({key[:12]})")
+        else:
+            print(f"▶️  {stage.name}: {len(changed)} changed input(s){', code changed' if code_changed else ''}")
+            full_rebuild = force or missing_outputs or not previous or code_changed
+            with step(stage.name):
+                stage.run(None if full_rebuild else changed)
+            ran.append(stage.name)
+            if use_cache:
+                artifact_cache.store(key, stage.outputs, cache_dir)
+
+        state[stage.name] = {**hashes, CODE_KEY: code}
+        save_state(state, state_path)
+
+    if use_cache:
+        evicted = artifact_cache.evict(max_cache_bytes, max_cache_age_days, cache_dir)
+        if evicted:
+            print(f"🧹 Evicted {len(evicted)} cached artifact(s)")
+
+    return ran
+
+def write_frame(df, path):
+    df.to_csv(path, index=False)
+    write_typed(df, path)
+    print(f"💾 {path}")
+
+def run_in_memory(workers=1, write_intermediates=False, n_draws=jr_simulation.N_DRAWS):
+    """
+    Every stage in one process, each handing its DataFrames straight to the
+    next: no CSV is re-parsed between stages, and the stage-to-stage files
+    (cleaned schedule, per-set table, season and master stats, full merged
+    dataset) are written only with `write_intermediates`. The final
+    artifacts are always written. Ignores the incremental state and cache.
+
+    Each stage writes its own result, then hands the next stage that frame
+    cast to the dtypes a CSV read would give, so every stage computes and
+    writes byte-for-byte what the staged run does.
+    """
+    with step("clean_schedule") as rec:
+        schedule_df, sets = schedule_cleaning.clean_schedule(pd.read_csv(schedule_cleaning.SCHEDULE_PATH))
+        rec.rows_out = len(schedule_df)
+        if write_intermediates:
+            write_frame(schedule_df, schedule_cleaning.OUTPUT_PATH)
+            sets.to_parquet(schedule_cleaning.SETS_OUTPUT_PATH, index=False)
+        schedule_df = as_csv_types(schedule_df)
+
+    with step("merge_stats") as rec:
+        stats_df, season_frames = stats_merge.build_master_stats(workers=workers, write_seasons=write_intermediates)
+        rec.rows_out = len(stats_df)
+        if write_intermediates:
+            write_frame(stats_df, stats_merge.STATS_OUTPUT_PATH)
+        stats_df = as_csv_types(stats_df)
+
+    with step("final_merge") as rec:
+        merged_df = final_merge.check_and_merge(schedule_df, stats_df, season_frames)
+        if merged_df is None:
+            raise SystemExit(1)
+        rec.rows_out = len(merged_df)
+        if write_intermediates:
+            write_frame(merged_df, final_merge.OUTPUT_PATH)
+        merged_df = as_csv_types(merged_df)
+
+    with step("enrich", rows_in=len(merged_df)) as rec:
+        enriched = add_advanced_tags.add_advanced_tags(merged_df, sets)
+        rec.rows_out = len(enriched)
+        write_frame(enriched, add_advanced_tags.OUTPUT_PATH)
+        enriched = as_csv_types(enriched)
+
+    totals = jr_allocation.load_jr_totals()
+    with step("allocate_jr", rows_in=len(enriched)) as rec:
+        allocated = jr_allocation.allocate_junior_stats(enriched, totals)
+        rec.rows_out = len(allocated)
+        write_frame(allocated, jr_allocation.OUTPUT_PATH)
+
+    with step("simulate_jr", rows_in=len(enriched)) as rec:
+        by_match, by_season = jr_simulation.simulate_junior_stats(enriched, totals, n_draws, workers=workers)
+        rec.rows_out = len(by_match)
+        write_frame(by_match, jr_simulation.MATCH_BANDS_PATH)
+        by_season.to_csv(jr_simulation.SEASON_BANDS_PATH, index=False)
+
+    with step("rate_opponents", rows_in=len(schedule_df)) as rec:
+        ratings, per_match = opponent_ratings.rate_opponents(schedule_df)
+        rec.rows_out = len(per_match)
+        ratings.to_csv(opponent_ratings.RATINGS_PATH, index=False)
+        per_match.to_csv(opponent_ratings.MATCH_RATINGS_PATH, index=False)
+
+    with step("head_to_head", rows_in=len(enriched)) as rec:
+        head_to_head = opponent_aggregates.opponent_head_to_head(enriched)
+        rec.rows_out = len(head_to_head)
+        write_frame(head_to_head, opponent_aggregates.OUTPUT_PATH)
+
+    return enriched
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the schedule/stats pipeline, skipping stages whose inputs are unchanged.")
+    parser.add_argument("--force", action="store_true", help="rerun every stage from scratch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for per-season stats ingestion")
+    parser.add_argument("--no-cache", action="store_true", help="don't read or write the artifact cache")
+    parser.add_argument("--cache-max-mb", type=int, default=artifact_cache.MAX_CACHE_BYTES // (1024 * 1024))
+    parser.add_argument("--cache-max-age-days", type=int, default=artifact_cache.MAX_CACHE_AGE_DAYS)
+    parser.add_argument("--trace-memory", action="store_true", help="record per-step peak allocations (slower)")
+    parser.add_argument("--profile", action="store_true", help="also write a cProfile dump and collapsed stacks for flame graphs")
+    parser.add_argument("--in-memory", action="store_true", help="run every stage in one process, passing DataFrames between them")
+    parser.add_argument("--write-intermediates", action="store_true", help="with --in-memory, also write the stage-to-stage files")
+    args = parser.parse_args()
+
+    if args.in_memory:
+        with run_report("pipeline_in_memory", trace_memory=args.trace_memory, profile=args.profile):
+            run_in_memory(workers=args.workers, write_intermediates=args.write_intermediates)
+        print("\n🎯 Pipeline done (in memory).")
+    else:
+        with run_report("pipeline", trace_memory=args.trace_memory, profile=args.profile):
+            ran = run_pipeline(
+                force=args.force,
+                workers=args.workers,
+                use_cache=not args.no_cache,
+                max_cache_bytes=args.cache_max_mb * 1024 * 1024,
+                max_cache_age_days=args.cache_max_age_days,
+            )
+        print(f"\n🎯 Pipeline done. Ran {len(ran)} stage(s): {', '.join(ran) or 'none'}")
@@ -0,0 +1,118 @@
+"""
+@name records.py
+@created October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+def _running_max(values, codes):
+    # inclusive running max per group (NaN never sets a record), plus each group's final max
+    frame = pd.DataFrame(values)
+    key = pd.Series(codes, index=frame.index)
+    running = frame.fillna(-np.inf).groupby(key).cummax().to_numpy()
+    final = frame.groupby(key).transform("max").to_numpy()
+    return running, final
+
+def _join_flags(flags, fields):
+    # ";"-joined names of the flagged fields per row, built column-wise instead of row by row
+    out = np.full(len(flags), "", dtype=object)
+    for j, field in enumerate(fields):
+        hit = flags[:, j]
+        out[hit] = np.where(out[hit] == "", field, out[hit] + ";" + field)
+    return out
+
+def record_flags(df, fields, season_col="season", eligible=None, career_groups=None):
+    """
+    Season and career highs for every field in one vectorized pass per scope.
+
+    Rows must already be in chronological order. A row holds a record
+    "at the time" when its value equals the running max of every eligible row
+    up to and including it; it holds the "final" record when it equals the max
+    over the whole season/career. Ties count for both. Ineligible rows (e.g.
+    DNP or no stats) neither hold nor set records.
+
+    `career_groups` (e.g. a player id) splits careers; None means one career.
+    Returns a DataFrame aligned to df with the four ";"-joined flag columns.
+    """
+    values = df[fields].astype("float64")
+    if eligible is not None:
+        values = values.where(pd.Series(eligible, index=df.index).fillna(False).astype(bool), axis=0)
+    present = values.notna().to_numpy()
+
+    if career_groups is None:
+        career = np.zeros(len(df), dtype=np.int64)
+    else:
+        career = pd.factorize(pd.Series(career_groups, index=df.index), use_na_sentinel=False)[0]
+    season = pd.factorize(
+        pd.Series(list(zip(career, df[season_col].astype(object))), index=df.index), use_na_sentinel=False
+    )[0]
+
+    v = values.to_numpy()
+    out = {}
+    for scope, codes in (("season", season), ("career", career)):
+        running, final = _running_max(values, codes)
+        out[f"{scope}_highs_at_time_flags"] = _join_flags(present & (v == running), fields)
+        out[f"{scope}_highs_flags"] = _join_flags(present & (v == final), fields)
+    return pd.DataFrame(out, index=df.index)
+
+class RecordBook:
+    """
+    Running season/career maxima for appending matches one at a time.
+
+    `append` costs O(fields): it compares the new line against the stored
+    maxima, updates them, and reports which fields are records at the time.
+    A new record also ends the "final" record of the earlier holders, which
+    `append` returns so callers can clear their flags.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.season_max = {}
+        self.career_max = {}
+        self.season_holders = {}
+        self.career_holders = {}
+
+    @classmethod
+    def from_frame(cls, df, fields, season_col="season", eligible=None, key_col="match_key"):
+        book = cls(fields)
+        mask = np.ones(len(df), dtype=bool) if eligible is None else pd.Series(eligible).fillna(False).to_numpy(dtype=bool)
+        for row, ok in zip(df[[key_col, season_col] + book.fields].itertuples(index=False), mask):
+            if ok:
+                book.append(row[0], row[1], dict(zip(book.fields, row[2:])))
+        return book
+
+    def _update(self, maxima, holders, key, values):
+        at_time, dethroned = [], {}
+        for field in self.fields:
+            value = values.get(field)
+            if value is None or pd.isna(value):
+                continue
+            best = maxima.get(field)
+            if best is None or value > best:
+                if holders.get(field):
+                    dethroned[field] = holders[field]
+                maxima[field] = value
+                holders[field] = [key]
+                at_time.append(field)
+            elif value == best:
+                holders[field].append(key)
+                at_time.append(field)
+        return at_time, dethroned
+
+    def append(self, key, season, values):
+        """
+        Record one eligible match. Returns a dict with the fields that are
+        season/career highs at the time, and for each field the keys of the
+        earlier matches that no longer hold the final record.
+        """
+        season_at, season_lost = self._update(
+            self.season_max.setdefault(season, {}), self.season_holders.setdefault(season, {}), key, values
+        )
+        career_at, career_lost = self._update(self.career_max, self.career_holders, key, values)
+        return {
+            "season_highs_at_time": season_at,
+            "career_highs_at_time": career_at,
+            "season_dethroned": season_lost,
+            "career_dethroned": career_lost,
+        }
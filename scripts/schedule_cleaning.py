@@ -5,24 +5,17 @@
 
 import pandas as pd
 
-def detect_comeback(set_scores, result):
-    if pd.isna(set_scores) or pd.isna(result):
-        return False
-    try:
-        sets = [int(s.split("-")[0]) < int(s.split("-")[1]) for s in set_scores.split(",")]
-        return sets[0] and result == "W"
-    except:
-        return False
-
-# load in raw master schedule
-df = pd.read_csv("data/schedules/master_schedule.csv")
-
-# parse/standardize dates of matches
-df["date"] = pd.to_datetime(df["date"], format="%m/%d/%Y")
-df["day_of_week"] = df["date"].dt.day_name()
-
-# changing Jackson-Reed back to Woodrow Wilson
-df["opponent"] = df["opponent"].replace("Jackson-Reed", "Woodrow Wilson")
+from set_scores import build_set_table, join_set_features
+from time_windows import add_workload_windows
+from streaks import streaks
+from dates import normalize_dates
+from typed_artifacts import write_typed
+from instrumentation import step, run_report
+from opponents import resolve_opponents, opponent_slugs, check_unmapped
+
+SCHEDULE_PATH = "data/schedules/master_schedule.csv"
+OUTPUT_PATH = "data/cleaned/cleaned_master_schedule.csv"
+SETS_OUTPUT_PATH = "data/cleaned/match_sets.parquet"
 
 # labeling seasons
 year_to_season = {
@@ -31,84 +24,9 @@ year_to_season = {
     2018: "JR",
     2019: "SR"
 }
-df["season"] = df["date"].dt.year.map(year_to_season)
-
-# slugs of opponents; using abbreviations dict
-opponent_slug_map = {
-    "Alabama School for the Deaf": "AIDB",
-    "Atlanta Area School for the Deaf": "AASD",
-    "Barrie": "BARRIE",
-    "Bell": "BELL",
-    "Berman Hebrew Academy": "BHA",
-    "Bishop Ireton": "BIHS",
-    "Bishop O'Connell": "BOHS",
-    "Brookewood": "BW",
-    "Bullis": "BULLIS",
-    "Burke": "BURKE",
-    "California School for the Deaf": "CSDF",
-    "California School for the Deaf-Riverside": "CSDR",
-    "Clinton Grace Christian": "CGC",
-    "Connelly School of the Holy Child": "CSHC",
-    "Covenant Life": "CL",
-    "DC International": "DCI",
-    "E.L. Haynes": "HAYNES",
-    "Episcopal": "EPISCOPAL",
-    "Field": "FIELD",
-    "Florida School for the Deaf & Blind": "FSDB",
-    "Fredericksburg Christian": "FCHS",
-    "Friends": "FRIENDS",
-    "Georgetown Day": "GTD",
-    "Grace Christian": "GC",
-    "Grace Christian Academy": "GCA",
-    "Highland": "HIGHLAND",
-    "Indiana School for the Deaf": "ISD",
-    "Interlachen": "INTERLACHEN",
-    "Islamic Saudi Academy": "ISA",
-    "King Abdullah Academy": "KAA",
-    "Maret": "MARET",
-    "Maryland School for the Deaf": "MSD",
-    "McLean": "MCLEAN",
-    "Mississippi School for the Deaf": "MISD",
-    "Mount Airy Christian Academy": "MACA",
-    "New Life Christian School": "NL",
-    "Oakcrest": "OAKCREST",
-    "Pallotti": "PALLOTTI",
-    "Parkside": "PARKSIDE",
-    "Princess Anne": "PA",
-    "River City Science Academy": "RCSA",
-    "Riverdale Baptist": "RB",
-    "Roosevelt": "ROOSEVELT",
-    "Sandy Spring Friends": "SSFS",
-    "School Without Walls": "SWW",
-    "Seton School": "SETON",
-    "Shalom Christian Academy": "SCA",
-    "Sidwell Friends": "SIDWELL",
-    "Smith Jewish Day School": "SJDS",
-    "Spencerville Adventist Academy": "SAA",
-    "St. John's": "SJ",
-    "St. John's Catholic Prep": "SJCP",
-    "Stone Ridge School of the Sacred Heart": "SRSSH",
-    "StoneBridge": "SB",
-    "Takoma Academy": "TA",
-    "Texas School for the Deaf": "TSD",
-    "Varsity Opponent": "VO",
-    "Washington Christian Academy": "WCA",
-    "Washington International": "WIS",
-    "Woodrow Wilson": "WILSON",
-}
-df["opponent_slug"] = df["opponent"].map(opponent_slug_map)
 
 # rivalries
 rival_opponents = ["MSD", "WIS", "CL"] # deaf, pvac, general rivals
-df["rivalry"] = df["opponent_slug"].isin(rival_opponents)
-
-# check for any unmapped opponents
-unmapped = df[df["opponent_slug"].isnull()]["opponent"].unique()
-if len(unmapped) > 0:
-    print("WARNING: Unmapped opponents found. Please update your slug map:")
-    for opponent in unmapped:
-        print(f'    "{opponent}": "",')
-    raise ValueError("STOP: unmapped opponents need to be filled in.")
 
 # forfeited, out sick, out injured matches
 forfeited_matches = [
@@ -117,28 +35,6 @@ forfeited_matches = [
 sick_dates = pd.to_datetime(['2016-09-27', '2017-09-18'])
 injured_dates = pd.to_datetime(['2017-11-07', '2017-11-08', '2018-09-27'])
 
-df["forfeited"] = df.apply(
-    lambda row: (row["date"].strftime("%Y-%m-%d"), row["opponent"]) in forfeited_matches,
-    axis=1
-)
-df["sick"] = df["date"].isin((sick_dates))
-df["injured"] = df["date"].isin((injured_dates))
-
-# count of matches per day
-df["match_no"] = df.groupby("date").cumcount() + 1
-df["total_matches_that_day"] = df.groupby("date")["date"].transform("count")
-df["same_day_opponent_seq"] = df.groupby(["date", "opponent"]).cumcount() + 1
-df["season_opponent_seq"] = df.groupby(["season", "opponent"]).cumcount() + 1
-df["is_repeat_opponent"] = df["season_opponent_seq"] > 1
-
-# match key
-df["match_key"] = (
-    df["season"].astype(str)
-    + "_" + df["date"].dt.strftime("%m-%d")
-    + "_" + df["opponent_slug"].str.replace(r'\W+', '', regex=True)
-    + "_" + df["match_no"].astype(str)
-)
-
 # game importances
 tournament_dates = ['2016-09-09', # FSDB Invitational 2016
                     '2016-09-24', # Model Invitational 2016
@@ -159,15 +55,13 @@ tournament_dates = ['2016-09-09', # FSDB Invitational 2016
                     '2019-10-12', # Wilson Tiger Paws Invitational 2019
                     ]
 
+# matches counted toward the career index despite a sick/injured/forfeit date
+career_index_overrides = ["JR_09-27_BOHS_1"]
+
 pvac_champs = ['2017-10-30', '2018-10-29', '2019-10-30']
 dcsaa_champs = ['2016-11-11']
 spikeout_champ_keys = ["senior_10-05_TSD_2"]
 
-df["is_championship"] = (
-    df["date"].isin(pd.to_datetime(pvac_champs + dcsaa_champs)) |
-    df["match_key"].isin(spikeout_champ_keys)
-)
-
 def infer_match_type(row):
     if row["forfeited"]:
         return "forfeit"
@@ -185,8 +79,6 @@ def infer_match_type(row):
         return "regular"
     return "regular"
 
-df["match_type"] = df.apply(infer_match_type, axis=1)
-
 importance_map = {
     "regular": ("low", 0),
     "tournament_pool": ("normal", 1),
@@ -197,8 +89,6 @@ importance_map = {
     "injured": ("low", 0),
     "sick": ("low", 0)
 }
-df["game_importance"] = df["match_type"].map(lambda x: importance_map.get(x, ("low", 0))[0])
-df["game_importance_score"] = df["match_type"].map(lambda x: importance_map.get(x, ("low", 0))[1])
 
 # event names
 event_name_map = {
@@ -236,212 +126,14 @@ event_name_map = {
     '2019-11-05': "DCSAA State Tournament First Round",
     '2019-11-06': "DCSAA State Tournament Quarterfinals"
 }
-df["event_name"] = df["date"].dt.strftime("%Y-%m-%d").map(event_name_map)
-
-# revenge matches (lost game, won next one against same team)
-df = df.sort_values(by="date").copy()
-df["prev_result_vs_opponent"] = (
-    df.groupby(["season", "opponent"])["result"].shift(1)
-)
-df["revenge_match"] = (df["prev_result_vs_opponent"] == "L") & (df["result"] == "W")
-
-# comeback wins
-df["comeback_win"] = df.apply(lambda row: detect_comeback(row["set_scores"], row["result"]), axis=1)
-
-# redemption games (lost last season, won next season)
-df["previous_season"] = df["season"].map({"SO": "FR", "JR": "SO", "SR": "JR"})
-
-prior_season_results = (
-    df.sort_values("date")
-      .groupby(["season", "opponent"])
-      .last()
-      .reset_index()[["season", "opponent", "result"]]
-)
-prior_season_results.columns = ["previous_season", "opponent", "prev_season_result"]
-
-df = df.merge(prior_season_results, on=["previous_season", "opponent"], how="left")
-df["redemption_game"] = (
-    (df["prev_season_result"] == "L") &
-    (df["result"] == "W")
-)
-
-# add favorite match & birthday match flags
-df["favorite_match"] = False
-df["birthday_match"] = df["date"].dt.strftime("%m-%d") == "09-21"
-
-# career match index
-df["counted_for_career_index"] = ~df["forfeited"] & ~df["injured"] & ~df["sick"]
-
-# special case override: 9/27/2018 match
-df.loc[df["match_key"] == "JR_09-27_BOHS_1", "counted_for_career_index"] = True
-
-# assign career index only to played matches
-played_matches = df[df["counted_for_career_index"]].sort_values("date").copy()
-played_matches["career_match_index"] = range(1, len(played_matches) + 1)
-
-df = df.merge(
-    played_matches[["match_key", "career_match_index"]],
-    on="match_key",
-    how="left"
-)
-
-df["did_play"] = df["career_match_index"].notna()
-
-df.drop(columns=["counted_for_career_index"], inplace=True)
-
-df["career_match_index"] = df["career_match_index"].astype("Int64")
-
-# season match #
-df["season_match_number"] = df.groupby("season").cumcount() + 1
-
-# week of season #
-df["week_of_season"] = (
-    df["date"] - df.groupby("season")["date"].transform("min")
-).dt.days // 7 + 1
-
-# days since last match
-df["days_since_last_match"] = df["date"].diff().dt.days.fillna(0).astype(int)
-
-# back to back?
-df["is_back_to_back"] = df["days_since_last_match"] == 1
-
-# match density
-df["match_density_3days"] = df["date"].apply(
-    lambda d: ((df["date"] >= d - pd.Timedelta(days=2)) & (df["date"] <= d)).sum()
-)
-
-# 1st/last match of day
-df["first_match_of_day"] = df.apply(
-    lambda row: True if row["match_no"] == 1 and row["total_matches_that_day"] > 1 else (
-        False if row["match_no"] != 1 and row["total_matches_that_day"] > 1 else pd.NA
-    ),
-    axis=1
-)
-df["last_match_of_day"] = df.apply(
-    lambda row: True if row["match_no"] == row["total_matches_that_day"] and row["total_matches_that_day"] > 1 else (
-        False if row["match_no"] != row["total_matches_that_day"] and row["total_matches_that_day"] > 1 else pd.NA
-    ),
-    axis=1
-)
-
-# season stage
-df["season_stage"] = (
-    df.groupby("season")["season_match_number"]
-    .transform(lambda x: pd.qcut(x, q=3, labels=["early", "mid", "late"]))
-)
-
-# career stage (25, 50, 75)
-df["career_stage"] = pd.qcut(
-    df["career_match_index"].dropna().astype(int),
-    q=[0, 0.25, 0.75, 1.0],
-    labels=["early", "mid", "late"]
-).reindex(df.index)
-
-# multi match day
-df["multi_game_day"] = df["total_matches_that_day"] > 1
-
-# milestone flags
-df["milestone_flag"] = ""
-
-df.loc[df["career_match_index"] == 1, "milestone_flag"] = "first MSSD match"
-
-first_season_match = df.groupby("season")["season_match_number"].idxmin()
-df.loc[first_season_match, "milestone_flag"] = df.loc[first_season_match, "milestone_flag"].apply(
-    lambda x: x + "; " if x else ""
-) + df.loc[first_season_match, "season"].map(lambda s: f"first {s} match")
-
-last_season_match = df.groupby("season")["season_match_number"].idxmax()
-df.loc[last_season_match, "milestone_flag"] = df.loc[last_season_match, "milestone_flag"].apply(
-    lambda x: x + "; " if x else ""
-) + df.loc[last_season_match, "season"].map(lambda s: f"last {s} match")
-
-df.loc[df["career_match_index"] == df["career_match_index"].max(), "milestone_flag"] = df.loc[
-    df["career_match_index"] == df["career_match_index"].max(), "milestone_flag"
-].apply(lambda x: x + "; " if x else "") + "last MSSD match"
-
-# set info
-df["was_set_swept"] = (df["result"] == "L") & (df["set_diff"] < 0) & (df["set_result"].str.startswith("0-"))
-df["swept_opponent"] = (df["result"] == "W") & (df["set_diff"] > 0) & (df["set_result"].str.endswith("-0"))
-df["deciding_set_played"] = df["set_count"].apply(
-    lambda x: x in [3, 5]
-)
-
-# scheduling info
-df["total_sets_that_day"] = df.groupby("date")["set_count"].transform("sum")
-
-# win/loss streaks
-df["win_streak"] = 0
-df["loss_streak"] = 0
-
-current_win = 0
-current_loss = 0
-streaks_win = []
-streaks_loss = []
-
-for res in df["result"]:
-    if res == "W":
-        current_win += 1
-        current_loss = 0
-    elif res == "L":
-        current_loss += 1
-        current_win = 0
-    else:
-        current_win = 0
-        current_loss = 0
-    streaks_win.append(current_win)
-    streaks_loss.append(current_loss)
-
-df["win_streak"] = streaks_win
-df["loss_streak"] = streaks_loss
-
-# psychological
-df["team_needed_win"] = df["loss_streak"] >= 2
-
-df["confidence_boost_game"] = (
-    (df["loss_streak"] >= 2) &
-    (df["result"] == "W")
-)
-df["confidence_boost_game"] = (
-    (df["loss_streak"] >= 2) &
-    (df["result"] == "W")
-)
-
-# highlight match
-df["highlight_match"] = False
-
-# total points for/against
-def get_total_points(row):
-    if pd.isna(row["set_scores"]):
-        return pd.Series([0, 0])
-    team_total, opp_total = 0, 0
-    for score in row["set_scores"].split(","):
-        try:
-            a, b = map(int, score.strip().split("-"))
-            if row["result"] == "W":
-                team_total += a
-                opp_total += b
-            else:
-                team_total += b
-                opp_total += a
-        except:
-            continue
-    return pd.Series([team_total, opp_total])
-
-df[["total_points_for", "total_points_against"]] = df.apply(get_total_points, axis=1)
-
-# margin %
-df["margin_pct"] = (
-    (df["total_points_for"] - df["total_points_against"]) /
-    (df["total_points_for"] + df["total_points_against"]).replace(0, pd.NA)
-)
-df["high_margin_win"] = (df["result"] == "W") & (df["margin_pct"] >= 0.6)
-df["low_margin_loss"] = (df["result"] == "L") & (df["margin_pct"] >= -0.1)
+
+# stage labels for season/career thirds
+stage_labels = ["early", "mid", "late"]
 
 # deaf schools
 deaf_schools = ["AIDB", "AASD", "CSDF", "CSDR", "FSDB", "ISD", "MSD", "MISD", "TSD"]
-df["deaf_school"] = df["opponent_slug"].isin(deaf_schools)
 
-# reorder columns
+# column order of the cleaned schedule
 desired_order = [
     # match identity & ordering
     "match_key",
@@ -456,6 +148,11 @@ desired_order = [
     "days_since_last_match",
     "is_back_to_back",
     "match_density_3days",
+    "match_density_7days",
+    "match_density_28days",
+    "set_density_3days",
+    "set_density_7days",
+    "set_density_28days",
 
     # same-day match context
     "match_no",
@@ -516,8 +213,259 @@ desired_order = [
     # external link
     "maxpreps"
 ]
-df = df[[col for col in desired_order if col in df.columns]]
 
-# save csv
-df.to_csv("data/schedules/cleaned_master_schedule.csv", index=False)
-print("✅ Schedule cleaned and saved as 'cleaned_master_schedule.csv'")
\ No newline at end of file
+def season_stages(season_match_number, seasons):
+    # thirds of each season by match number
+    return season_match_number.groupby(seasons).transform(lambda x: pd.qcut(x, q=3, labels=stage_labels))
+
+def career_stages(career_match_index):
+    # career stage (25, 50, 75) over the matches with a career index
+    return pd.qcut(
+        career_match_index.dropna().astype(int),
+        q=[0, 0.25, 0.75, 1.0],
+        labels=stage_labels
+    ).reindex(career_match_index.index)
+
+def clean_schedule(df):
+    # parse/standardize dates of matches
+    with step("normalize_dates", rows_in=len(df)):
+        df["date"] = normalize_dates(df["date"])
+    df["day_of_week"] = df["date"].dt.day_name()
+
+    with step("opponent_mapping", rows_in=len(df)):
+        # canonical opponent names (e.g. Jackson-Reed back to Woodrow Wilson)
+        df["opponent"] = resolve_opponents(df["opponent"])
+
+        # labeling seasons
+        df["season"] = df["date"].dt.year.map(year_to_season)
+
+        # slugs of opponents
+        df["opponent_slug"] = opponent_slugs(df["opponent"])
+
+        # rivalries
+        df["rivalry"] = df["opponent_slug"].isin(rival_opponents)
+
+        # check for any unmapped opponents
+        check_unmapped(df)
+
+    # forfeited, out sick, out injured matches
+    df["forfeited"] = df.apply(
+        lambda row: (row["date"].strftime("%Y-%m-%d"), row["opponent"]) in forfeited_matches,
+        axis=1
+    )
+    df["sick"] = df["date"].isin((sick_dates))
+    df["injured"] = df["date"].isin((injured_dates))
+
+    # count of matches per day
+    df["match_no"] = df.groupby("date").cumcount() + 1
+    df["total_matches_that_day"] = df.groupby("date")["date"].transform("count")
+    df["same_day_opponent_seq"] = df.groupby(["date", "opponent"]).cumcount() + 1
+    df["season_opponent_seq"] = df.groupby(["season", "opponent"]).cumcount() + 1
+    df["is_repeat_opponent"] = df["season_opponent_seq"] > 1
+
+    # match key
+    df["match_key"] = (
+        df["season"].astype(str)
+        + "_" + df["date"].dt.strftime("%m-%d")
+        + "_" + df["opponent_slug"].str.replace(r'\W+', '', regex=True)
+        + "_" + df["match_no"].astype(str)
+    )
+
+    # game importances
+    df["is_championship"] = (
+        df["date"].isin(pd.to_datetime(pvac_champs + dcsaa_champs)) |
+        df["match_key"].isin(spikeout_champ_keys)
+    )
+
+    df["match_type"] = df.apply(infer_match_type, axis=1)
+
+    df["game_importance"] = df["match_type"].map(lambda x: importance_map.get(x, ("low", 0))[0])
+    df["game_importance_score"] = df["match_type"].map(lambda x: importance_map.get(x, ("low", 0))[1])
+
+    # event names
+    df["event_name"] = df["date"].dt.strftime("%Y-%m-%d").map(event_name_map)
+
+    # revenge matches (lost game, won next one against same team)
+    # stable: same-day matches keep their match_no order for every running count below
+    df = df.sort_values(by="date", kind="mergesort").copy()
+    df["prev_result_vs_opponent"] = (
+        df.groupby(["season", "opponent"])["result"].shift(1)
+    )
+    df["revenge_match"] = (df["prev_result_vs_opponent"] == "L") & (df["result"] == "W")
+
+    with step("set_table", rows_in=len(df)) as rec:
+        # per-set table built once; comeback wins + total points for/against are reductions over it
+        sets = build_set_table(df["match_key"], df["set_scores"])
+        set_features = join_set_features(df, sets)
+        rec.rows_out = len(sets)
+
+    df["comeback_win"] = set_features["first_set_won"].eq(False) & (df["result"] == "W")
+    df["total_points_for"] = set_features["total_points_for"]
+    df["total_points_against"] = set_features["total_points_against"]
+
+    # redemption games (lost last season, won next season)
+    df["previous_season"] = df["season"].map({"SO": "FR", "JR": "SO", "SR": "JR"})
+
+    prior_season_results = (
+        df.sort_values("date", kind="mergesort")
+          .groupby(["season", "opponent"])
+          .last()
+          .reset_index()[["season", "opponent", "result"]]
+    )
+    prior_season_results.columns = ["previous_season", "opponent", "prev_season_result"]
+
+    df = df.merge(prior_season_results, on=["previous_season", "opponent"], how="left")
+    df["redemption_game"] = (
+        (df["prev_season_result"] == "L") &
+        (df["result"] == "W")
+    )
+
+    # add favorite match & birthday match flags
+    df["favorite_match"] = False
+    df["birthday_match"] = df["date"].dt.strftime("%m-%d") == "09-21"
+
+    # career match index
+    df["counted_for_career_index"] = ~df["forfeited"] & ~df["injured"] & ~df["sick"]
+
+    # special case override: 9/27/2018 match
+    df.loc[df["match_key"].isin(career_index_overrides), "counted_for_career_index"] = True
+
+    # assign career index only to played matches
+    played_matches = df[df["counted_for_career_index"]].sort_values("date", kind="mergesort").copy()
+    played_matches["career_match_index"] = range(1, len(played_matches) + 1)
+
+    df = df.merge(
+        played_matches[["match_key", "career_match_index"]],
+        on="match_key",
+        how="left"
+    )
+
+    df["did_play"] = df["career_match_index"].notna()
+
+    df.drop(columns=["counted_for_career_index"], inplace=True)
+
+    df["career_match_index"] = df["career_match_index"].astype("Int64")
+
+    # season match #
+    df["season_match_number"] = df.groupby("season").cumcount() + 1
+
+    # week of season #
+    df["week_of_season"] = (
+        df["date"] - df.groupby("season")["date"].transform("min")
+    ).dt.days // 7 + 1
+
+    # days since last match
+    df["days_since_last_match"] = df["date"].diff().dt.days.fillna(0).astype(int)
+
+    # back to back?
+    df["is_back_to_back"] = df["days_since_last_match"] == 1
+
+    # match/set density over trailing 3, 7, 28 day windows (per season)
+    with step("workload_windows", rows_in=len(df)):
+        df = add_workload_windows(df)
+
+    # 1st/last match of day
+    df["first_match_of_day"] = df.apply(
+        lambda row: True if row["match_no"] == 1 and row["total_matches_that_day"] > 1 else (
+            False if row["match_no"] != 1 and row["total_matches_that_day"] > 1 else pd.NA
+        ),
+        axis=1
+    )
+    df["last_match_of_day"] = df.apply(
+        lambda row: True if row["match_no"] == row["total_matches_that_day"] and row["total_matches_that_day"] > 1 else (
+            False if row["match_no"] != row["total_matches_that_day"] and row["total_matches_that_day"] > 1 else pd.NA
+        ),
+        axis=1
+    )
+
+    # season stage
+    df["season_stage"] = season_stages(df["season_match_number"], df["season"])
+
+    # career stage (25, 50, 75)
+    df["career_stage"] = career_stages(df["career_match_index"])
+
+    # multi match day
+    df["multi_game_day"] = df["total_matches_that_day"] > 1
+
+    # milestone flags
+    df["milestone_flag"] = ""
+
+    df.loc[df["career_match_index"] == 1, "milestone_flag"] = "first MSSD match"
+
+    first_season_match = df.groupby("season")["season_match_number"].idxmin()
+    df.loc[first_season_match, "milestone_flag"] = df.loc[first_season_match, "milestone_flag"].apply(
+        lambda x: x + "; " if x else ""
+    ) + df.loc[first_season_match, "season"].map(lambda s: f"first {s} match")
+
+    last_season_match = df.groupby("season")["season_match_number"].idxmax()
+    df.loc[last_season_match, "milestone_flag"] = df.loc[last_season_match, "milestone_flag"].apply(
+        lambda x: x + "; " if x else ""
+    ) + df.loc[last_season_match, "season"].map(lambda s: f"last {s} match")
+
+    df.loc[df["career_match_index"] == df["career_match_index"].max(), "milestone_flag"] = df.loc[
+        df["career_match_index"] == df["career_match_index"].max(), "milestone_flag"
+    ].apply(lambda x: x + "; " if x else "") + "last MSSD match"
+
+    # set info
+    df["was_set_swept"] = (df["result"] == "L") & (df["set_diff"] < 0) & (df["set_result"].str.startswith("0-"))
+    df["swept_opponent"] = (df["result"] == "W") & (df["set_diff"] > 0) & (df["set_result"].str.endswith("-0"))
+    df["deciding_set_played"] = df["set_count"].apply(
+        lambda x: x in [3, 5]
+    )
+
+    # scheduling info
+    df["total_sets_that_day"] = df.groupby("date")["set_count"].transform("sum")
+
+    # win/loss streaks (reset at the start of each season)
+    with step("streaks", rows_in=len(df)):
+        df["win_streak"] = streaks(df["result"] == "W", groups=df["season"])["current"]
+        df["loss_streak"] = streaks(df["result"] == "L", groups=df["season"])["current"]
+
+    # psychological
+    df["team_needed_win"] = df["loss_streak"] >= 2
+
+    df["confidence_boost_game"] = (
+        (df["loss_streak"] >= 2) &
+        (df["result"] == "W")
+    )
+    df["confidence_boost_game"] = (
+        (df["loss_streak"] >= 2) &
+        (df["result"] == "W")
+    )
+
+    # highlight match
+    df["highlight_match"] = False
+
+    # margin %
+    df["margin_pct"] = (
+        (df["total_points_for"] - df["total_points_against"]) /
+        (df["total_points_for"] + df["total_points_against"]).replace(0, pd.NA)
+    )
+    df["high_margin_win"] = (df["result"] == "W") & (df["margin_pct"] >= 0.6)
+    df["low_margin_loss"] = (df["result"] == "L") & (df["margin_pct"] >= -0.1)
+
+    # deaf schools
+    df["deaf_school"] = df["opponent_slug"].isin(deaf_schools)
+
+    # reorder columns
+    df = df[[col for col in desired_order if col in df.columns]]
+    return df, sets
+
+def main(schedule_path=SCHEDULE_PATH, output_path=OUTPUT_PATH, sets_path=SETS_OUTPUT_PATH):
+    with step("read_schedule") as rec:
+        df = pd.read_csv(schedule_path)
+        rec.rows_out = len(df)
+    with step("clean_schedule", rows_in=len(df)) as rec:
+        df, sets = clean_schedule(df)
+        rec.rows_out = len(df)
+    with step("write", rows_in=len(df)):
+        df.to_csv(output_path, index=False)
+        write_typed(df, output_path)
+        sets.to_parquet(sets_path, index=False)
+    print("✅ Schedule cleaned and saved as 'cleaned_master_schedule.csv'")
+    print(f"✅ Per-set table ({len(sets)} sets) saved as '{sets_path}'")
+    return df, sets
+
+if __name__ == "__main__":
+    with run_report("clean_schedule"):
+        main()
@@ -0,0 +1,95 @@
+"""
+@name set_scores.py
+@created October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+SET_SCORE_PATTERN = r"(\d+)\s*-\s*(\d+)"
+
+def parse_set_scores(set_scores):
+    """
+    Parse a whole column of "25-22,19-25,..." strings in one pass.
+
+    Scores are written from our side of the net, so the left number of each
+    set is our points. Returns (pts_for, pts_against, n_sets) where the first
+    two are (n_matches, max_sets) int arrays padded with 0 and n_sets holds
+    how many sets were parsed for each match.
+    """
+    scores = pd.Series(set_scores).reset_index(drop=True)
+    n = len(scores)
+
+    pairs = scores.dropna().astype(str).str.extractall(SET_SCORE_PATTERN)
+    if pairs.empty:
+        empty = np.zeros((n, 0), dtype=np.int64)
+        return empty, empty.copy(), np.zeros(n, dtype=np.int64)
+
+    rows = pairs.index.get_level_values(0).to_numpy()
+    set_idx = pairs.index.get_level_values(1).to_numpy()
+    width = set_idx.max() + 1
+
+    pts_for = np.zeros((n, width), dtype=np.int64)
+    pts_against = np.zeros((n, width), dtype=np.int64)
+    pts_for[rows, set_idx] = pairs[0].astype(np.int64).to_numpy()
+    pts_against[rows, set_idx] = pairs[1].astype(np.int64).to_numpy()
+    n_sets = np.bincount(rows, minlength=n)
+
+    return pts_for, pts_against, n_sets
+
+def last_set_margin(pts_for, pts_against, n_sets):
+    # signed margin of the final set played, NaN when there are no set scores
+    margin = np.full(len(n_sets), np.nan)
+    played = n_sets > 0
+    rows = np.flatnonzero(played)
+    last = n_sets[played] - 1
+    margin[played] = pts_for[rows, last] - pts_against[rows, last]
+    return margin
+
+def build_set_table(match_keys, set_scores):
+    """
+    Long-format per-set table: one row per (match_key, set_no) with our points,
+    their points and whether we won the set. Built once from the parsed arrays
+    so set-level features are group reductions instead of string reparsing.
+    """
+    pts_for, pts_against, n_sets = parse_set_scores(set_scores)
+    keys = pd.Series(match_keys).reset_index(drop=True).to_numpy()
+
+    rows, set_idx = np.nonzero(np.arange(pts_for.shape[1]) < n_sets[:, None])
+    sets = pd.DataFrame({
+        "match_key": pd.Categorical(keys[rows]),
+        "set_no": (set_idx + 1).astype(np.int8),
+        "pts_for": pts_for[rows, set_idx].astype(np.int16),
+        "pts_against": pts_against[rows, set_idx].astype(np.int16),
+    })
+    sets["won"] = sets["pts_for"] > sets["pts_against"]
+    return sets
+
+def match_set_features(sets):
+    # per-match reductions over the set table, indexed by match_key
+    by_match = sets.groupby("match_key", observed=True, sort=False)
+    features = by_match.agg(
+        n_sets=("set_no", "size"),
+        sets_won=("won", "sum"),
+        total_points_for=("pts_for", "sum"),
+        total_points_against=("pts_against", "sum"),
+    )
+    features["sets_lost"] = features["n_sets"] - features["sets_won"]
+
+    first = sets[sets["set_no"] == 1].set_index("match_key")
+    features["first_set_won"] = first["won"].reindex(features.index)
+
+    last = sets.loc[by_match["set_no"].idxmax()].set_index("match_key")
+    features["last_set_margin"] = (last["pts_for"] - last["pts_against"]).reindex(features.index)
+
+    return features
+
+def join_set_features(df, sets, key="match_key"):
+    # matches without set scores get 0 points, 0 sets and NaN first/last set info
+    features = match_set_features(sets)
+    features.index = features.index.astype(object)
+    joined = features.reindex(df[key].to_numpy())
+    for col in ["n_sets", "sets_won", "sets_lost", "total_points_for", "total_points_against"]:
+        joined[col] = joined[col].fillna(0).astype(np.int64)
+    joined.index = df.index
+    return joined
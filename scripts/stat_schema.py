@@ -0,0 +1,103 @@
+"""
+@name stat_schema.py
+@created October 2026
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+# raw dates are "MM/DD" (season year is injected later); a few files carry full ISO dates
+RAW_DATE_PATTERN = r"^\s*(\d{1,2}/\d{1,2}|\d{4}-\d{2}-\d{2})\s*$"
+
+META_SCHEMA = {
+    "match_key": "string",
+    "date": "string",
+    "result": "string",
+    "opponent": "string",
+    "sets_played": "Int64",
+}
+
+# declared column types for every file in stats_merge.STAT_CATEGORIES
+STAT_SCHEMAS = {
+    "attacking": {
+        "kills": "Int64",
+        "kills_per_set": "Float64",
+        "kill_pct": "Float64",
+        "kill_att": "Int64",
+        "kill_err": "Int64",
+        "hit_pct": "Float64",
+    },
+    "ball_handling": {
+        "assists": "Int64",
+        "assists_per_set": "Float64",
+        "ball_handling_att": "Int64",
+        "ball_handling_err": "Int64",
+    },
+    "blocking": {
+        "solo_blks": "Int64",
+        "assisted_blks": "Int64",
+        "total_blks": "Int64",
+        "blks_per_set": "Float64",
+        "blk_err": "Int64",
+    },
+    "digging": {
+        "digs": "Int64",
+        "dig_err": "Int64",
+        "digs_per_set": "Float64",
+    },
+    "serve_receiving": {
+        "receiving": "Int64",
+        "receiving_err": "Int64",
+        "receiving_per_set": "Float64",
+    },
+    "serving": {
+        "aces": "Int64",
+        "aces_per_set": "Float64",
+        "ace_pct": "Float64",
+        "serve_att": "Int64",
+        "serve_err": "Int64",
+        "serve_pct": "Float64",
+        "points": "Int64",
+    },
+}
+
+def category_schema(stat_category):
+    return {**META_SCHEMA, **STAT_SCHEMAS[stat_category]}
+
+def read_category_csv(file_path, stat_category):
+    schema = category_schema(stat_category)
+
+    header = pd.read_csv(file_path, nrows=0).columns
+    missing = [col for col in schema if col not in header]
+    if missing:
+        raise ValueError(f"{file_path}: missing columns {missing}")
+    extra = [col for col in header if col not in schema]
+    if extra:
+        print(f"WARNING: {file_path} has undeclared columns {extra}; reading them untyped.")
+
+    try:
+        df = pd.read_csv(file_path, dtype=schema, engine=CSV_ENGINE)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"{file_path}: values don't fit the declared {stat_category} schema ({e})") from e
+
+    bad_dates = df["date"].notna() & ~df["date"].str.match(RAW_DATE_PATTERN).fillna(False)
+    if bad_dates.any():
+        raise ValueError(f"{file_path}: unrecognized date values {df.loc[bad_dates, 'date'].unique().tolist()}")
+
+    return df
+
+def read_season_categories(paths_by_category, max_threads=None):
+    # the per-category reads are independent; pyarrow releases the GIL, so threads overlap the parsing
+    with ThreadPoolExecutor(max_workers=max_threads or len(paths_by_category) or 1) as pool:
+        futures = {
+            stat_category: pool.submit(read_category_csv, path, stat_category)
+            for stat_category, path in paths_by_category.items()
+        }
+        return {stat_category: future.result() for stat_category, future in futures.items()}
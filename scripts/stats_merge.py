@@ -3,10 +3,18 @@
 @created July 2025
 """
 
-import pandas as pd
-import re
+import argparse
 import os
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from dates import normalize_dates
+from stat_schema import read_season_categories
+from typed_artifacts import write_typed
+from instrumentation import step, run_report
+from opponents import canonical_opponent, get_opponent_slug, resolve_opponents, opponent_slugs, check_unmapped
 
 DATA_DIR = "data/raw"
 OUTPUT_DIR = "data/cleaned"
@@ -16,76 +24,45 @@ SEASON_YEAR_MAP = {
     "junior": (2018, "JR"),
     "senior": (2019, "SR"),
 }
+SEASON_CODE_YEARS = {season_code: year for year, season_code in SEASON_YEAR_MAP.values()}
 STAT_CATEGORIES = ["attacking", "ball_handling", "blocking", "digging", "serve_receiving", "serving"]
-
-opponent_name_corrections = {
-    "Jackson-Reed": "Woodrow Wilson"
-}
-
-opponent_slug_map = {
-    "Alabama School for the Deaf": "AIDB",
-    "Atlanta Area School for the Deaf": "AASD",
-    "Barrie": "BARRIE",
-    "Bell": "BELL",
-    "Berman Hebrew Academy": "BHA",
-    "Bishop Ireton": "BIHS",
-    "Bishop O'Connell": "BOHS",
-    "Brookewood": "BW",
-    "Bullis": "BULLIS",
-    "Burke": "BURKE",
-    "California School for the Deaf": "CSDF",
-    "California School for the Deaf-Riverside": "CSDR",
-    "Clinton Grace Christian": "CGC",
-    "Connelly School of the Holy Child": "CSHC",
-    "Covenant Life": "CL",
-    "DC International": "DCI",
-    "E.L. Haynes": "HAYNES",
-    "Episcopal": "EPISCOPAL",
-    "Field": "FIELD",
-    "Florida School for the Deaf & Blind": "FSDB",
-    "Fredericksburg Christian": "FCHS",
-    "Friends": "FRIENDS",
-    "Georgetown Day": "GTD",
-    "Grace Christian": "GC",
-    "Grace Christian Academy": "GCA",
-    "Highland": "HIGHLAND",
-    "Indiana School for the Deaf": "ISD",
-    "Interlachen": "INTERLACHEN",
-    "Islamic Saudi Academy": "ISA",
-    "King Abdullah Academy": "KAA",
-    "Maret": "MARET",
-    "Maryland School for the Deaf": "MSD",
-    "McLean": "MCLEAN",
-    "Mississippi School for the Deaf": "MISD",
-    "Mount Airy Christian Academy": "MACA",
-    "Oakcrest": "OAKCREST",
-    "Pallotti": "PALLOTTI",
-    "Parkside": "PARKSIDE",
-    "Princess Anne": "PA",
-    "River City Science Academy": "RCSA",
-    "Riverdale Baptist": "RB",
-    "Roosevelt": "ROOSEVELT",
-    "Sandy Spring Friends": "SSFS",
-    "School Without Walls": "SWW",
-    "Seton School": "SETON",
-    "Shalom Christian Academy": "SCA",
-    "Sidwell Friends": "SIDWELL",
-    "Smith Jewish Day School": "SJDS",
-    "Spencerville Adventist Academy": "SAA",
-    "St. John's": "SJ",
-    "St. John's Catholic Prep": "SJCP",
-    "Stone Ridge School of the Sacred Heart": "SRSSH",
-    "StoneBridge": "SB",
-    "Takoma Academy": "TA",
-    "Texas School for the Deaf": "TSD",
-    "Varsity Opponent": "VO",
-    "Washington Christian Academy": "WCA",
-    "Washington International": "WIS",
-    "Woodrow Wilson": "WILSON",
+JUNIOR_SCHEDULE_PATH = os.path.join("data/schedules/season", "junior_schedule.csv")
+STATS_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "NEW_all_stats_merged.csv")
+
+# suffixed category columns -> final stat names
+STAT_RENAME_MAP = {
+    "kills_attacking": "kills",
+    "kills_per_set_attacking": "kills_per_set",
+    "kill_pct_attacking": "kill_pct",
+    "kill_att_attacking": "kill_attempts",
+    "kill_err_attacking": "kill_errors",
+    "hit_pct_attacking": "hit_pct",
+    "assists_ball_handling": "assists",
+    "assists_per_set_ball_handling": "assists_per_set",
+    "ball_handling_att_ball_handling": "ball_handling_attempts",
+    "ball_handling_err_ball_handling": "ball_handling_errors",
+    "solo_blks_blocking": "solo_blocks",
+    "assisted_blks_blocking": "assisted_blocks",
+    "total_blks_blocking": "total_blocks",
+    "blks_per_set_blocking": "blocks_per_set",
+    "blk_err_blocking": "block_errors",
+    "digs_digging": "digs",
+    "digs_per_set_digging": "digs_per_set",
+    "dig_err_digging": "dig_errors",
+    "receiving_serve_receiving": "receiving",
+    "receiving_err_serve_receiving": "receiving_errors",
+    "receiving_per_set_serve_receiving": "receiving_per_set",
+    "aces_serving": "aces",
+    "aces_per_set_serving": "aces_per_set",
+    "ace_pct_serving": "ace_pct",
+    "serve_att_serving": "serve_attempts",
+    "serve_err_serving": "serve_errors",
+    "serve_pct_serving": "serve_pct",
+    "points_serving": "points"
 }
 
 def create_junior_stat_rows_from_schedule():
-    schedule_path = os.path.join("data/schedules/season", "junior_schedule.csv")
+    schedule_path = JUNIOR_SCHEDULE_PATH
     if not os.path.exists(schedule_path):
         print("Missing junior schedule file!")
         return pd.DataFrame()
@@ -93,9 +70,11 @@ def create_junior_stat_rows_from_schedule():
     schedule_df = pd.read_csv(schedule_path)
     year, season_code = 2018, "JR"
 
-    schedule_df['opponent'] = schedule_df['opponent'].apply(clean_opponent_name)
-    schedule_df['date'] = schedule_df['date'].apply(lambda d: format_date(d, year))
-    schedule_df['opponent_slug'] = schedule_df['opponent'].apply(get_opponent_slug)
+    with step("opponent_mapping", rows_in=len(schedule_df)):
+        schedule_df['opponent'] = resolve_opponents(schedule_df['opponent'])
+        schedule_df['date'] = normalize_dates(schedule_df['date'], year=year).dt.strftime("%Y-%m-%d")
+        schedule_df['opponent_slug'] = opponent_slugs(schedule_df['opponent'])
+        check_unmapped(schedule_df)
     schedule_df['season'] = season_code
 
     schedule_df["match_no"] = schedule_df.groupby("date").cumcount() + 1
@@ -131,19 +110,7 @@ def create_junior_stat_rows_from_schedule():
     return schedule_df
 
 def clean_opponent_name(name):
-    return opponent_name_corrections.get(name, name)
-
-def format_date(date_str, year):
-    if pd.isna(date_str):
-        return None
-    try:
-        parsed = datetime.strptime(date_str.strip(), "%m/%d")
-        return parsed.replace(year=year).strftime("%Y-%m-%d")
-    except ValueError:
-        return None
-
-def get_opponent_slug(opponent):
-    return opponent_slug_map.get(opponent, re.sub(r'[^A-Z]', '', opponent.upper())[:3])
+    return canonical_opponent(name) or name
 
 def suffix_stat_columns(df, stat_category):
     meta_cols = ["match_key", "date", "opponent", "result", "sets_played", "season", "opponent_slug"]
@@ -180,83 +147,84 @@ def enforce_column_types(df):
 
     return df
 
-def merge_stats():
-    all_seasons_merged = []
+def season_input_paths(season_folder, data_dir=DATA_DIR):
+    season_path = os.path.join(data_dir, season_folder)
+    return [os.path.join(season_path, f"{stat_category}.csv") for stat_category in STAT_CATEGORIES]
 
+def season_output_path(season_folder, output_dir=OUTPUT_DIR):
+    return os.path.join(output_dir, f"{season_folder}_stats_merged.csv")
+
+def merge_season(season_folder, data_dir=DATA_DIR):
     # merge FR/SO/SR with match_key already in files
-    for season_folder in SEASON_YEAR_MAP:
-        year, season_code = SEASON_YEAR_MAP[season_folder]
-        season_path = os.path.join(DATA_DIR, season_folder)
-        print(f"Processing {season_folder} ({season_code}, {year})...")
+    year, season_code = SEASON_YEAR_MAP[season_folder]
+    print(f"Processing {season_folder} ({season_code}, {year})...")
 
-        merged_dfs = []
+    merged_dfs = []
 
-        for stat_category in STAT_CATEGORIES:
-            file_path = os.path.join(season_path, f"{stat_category}.csv")
-            if os.path.exists(file_path):
-                df = pd.read_csv(file_path)
+    paths_by_category = {}
+    for file_path, stat_category in zip(season_input_paths(season_folder, data_dir), STAT_CATEGORIES):
+        if os.path.exists(file_path):
+            paths_by_category[stat_category] = file_path
+        else:
+            print(f"Missing: {file_path}")
 
-                if "match_key" not in df.columns:
-                    print(f"ERROR: {file_path} missing 'match_key' column.")
-                    continue
+    # typed, schema-checked reads of all category files at once
+    with step(f"read_categories:{season_folder}") as rec:
+        frames = read_season_categories(paths_by_category)
+        rec.rows_out = sum(len(df) for df in frames.values())
 
-                df["season"] = season_code
-                df = suffix_stat_columns(df, stat_category)
-                df = df.set_index("match_key")
+    for stat_category, df in frames.items():
+        df["season"] = season_code
+        df = suffix_stat_columns(df, stat_category)
+        df = df.set_index("match_key")
 
-                if merged_dfs:
-                    meta_cols = {"date", "opponent", "result", "sets_played", "season", "opponent_slug"}
-                    df = df.drop(columns=[col for col in meta_cols if col in df.columns], errors="ignore")
+        if merged_dfs:
+            meta_cols = {"date", "opponent", "result", "sets_played", "season", "opponent_slug"}
+            df = df.drop(columns=[col for col in meta_cols if col in df.columns], errors="ignore")
 
-                merged_dfs.append(df)
-            else:
-                print(f"Missing: {file_path}")
+        merged_dfs.append(df)
 
-        if merged_dfs:
-            season_merged = pd.concat(merged_dfs, axis=1, join="outer").reset_index()
-            all_seasons_merged.append(season_merged)
-
-            out_path = os.path.join(OUTPUT_DIR, f"{season_folder}_stats_merged.csv")
-
-            def fix_date_with_year_row(row):
-                year_map = {"FR": 2016, "SO": 2017, "JR": 2018, "SR": 2019}
-                try:
-                    date_str = row["date"]
-                    year = year_map.get(row["season"])
-                    if pd.isna(date_str) or pd.isna(year):
-                        return pd.NA
-                    dt = datetime.strptime(date_str.strip(), "%m/%d") if len(date_str.strip()) <= 5 else datetime.strptime(date_str.strip(), "%Y-%m-%d")
-                    return dt.replace(year=year).strftime("%Y-%m-%d")
-                except Exception:
-                    return pd.NA
-
-            season_merged["date"] = season_merged.apply(fix_date_with_year_row, axis=1)
-
-            final_cols = [
-                "match_key", "date", "result", "opponent", "sets_played",
-                "kills_attacking", "kills_per_set_attacking", "kill_pct_attacking", 
-                "kill_att_attacking", "kill_err_attacking", "hit_pct_attacking",
-                "season",
-                "assists_ball_handling", "assists_per_set_ball_handling", 
-                "ball_handling_att_ball_handling", "ball_handling_err_ball_handling",
-                "solo_blks_blocking", "assisted_blks_blocking", "total_blks_blocking", 
-                "blks_per_set_blocking", "blk_err_blocking",
-                "digs_digging", "dig_err_digging", "digs_per_set_digging",
-                "receiving_serve_receiving", "receiving_err_serve_receiving", 
-                "receiving_per_set_serve_receiving",
-                "aces_serving", "aces_per_set_serving", "ace_pct_serving", 
-                "serve_att_serving", "serve_err_serving", "serve_pct_serving", 
-                "points_serving",
-            ]
-
-            for col in final_cols:
-                if col not in season_merged.columns:
-                    season_merged[col] = pd.NA
-            season_merged = season_merged[[col for col in final_cols if col in season_merged.columns]]
-            season_merged = enforce_column_types(season_merged)
-
-            season_merged.to_csv(out_path, index=False)
-            print(f"Saved: {out_path}")
+    if not merged_dfs:
+        return None
+
+    season_merged = pd.concat(merged_dfs, axis=1, join="outer").reset_index()
+    season_merged["date"] = normalize_dates(
+        season_merged["date"], seasons=season_merged["season"], season_years=SEASON_CODE_YEARS
+    ).dt.strftime("%Y-%m-%d")
+
+    final_cols = [
+        "match_key", "date", "result", "opponent", "sets_played",
+        "kills_attacking", "kills_per_set_attacking", "kill_pct_attacking", 
+        "kill_att_attacking", "kill_err_attacking", "hit_pct_attacking",
+        "season",
+        "assists_ball_handling", "assists_per_set_ball_handling", 
+        "ball_handling_att_ball_handling", "ball_handling_err_ball_handling",
+        "solo_blks_blocking", "assisted_blks_blocking", "total_blks_blocking", 
+        "blks_per_set_blocking", "blk_err_blocking",
+        "digs_digging", "dig_err_digging", "digs_per_set_digging",
+        "receiving_serve_receiving", "receiving_err_serve_receiving", 
+        "receiving_per_set_serve_receiving",
+        "aces_serving", "aces_per_set_serving", "ace_pct_serving", 
+        "serve_att_serving", "serve_err_serving", "serve_pct_serving", 
+        "points_serving",
+    ]
+
+    for col in final_cols:
+        if col not in season_merged.columns:
+            season_merged[col] = pd.NA
+    season_merged = season_merged[[col for col in final_cols if col in season_merged.columns]]
+    season_merged = enforce_column_types(season_merged)
+    return season_merged
+
+def load_season(season_folder, output_dir=OUTPUT_DIR):
+    # reuse a previously merged season file instead of re-reading the raw categories
+    out_path = season_output_path(season_folder, output_dir)
+    if not os.path.exists(out_path):
+        return None
+    return enforce_column_types(pd.read_csv(out_path))
+
+def combine_seasons(all_seasons_merged):
+    all_seasons_merged = list(all_seasons_merged)
 
     # JR placeholder rows (no stats)
     jr_df = create_junior_stat_rows_from_schedule()
@@ -300,6 +268,8 @@ def merge_stats():
     for date_str, opponent, season_code in dnp_entries:
         opponent_clean = clean_opponent_name(opponent)
         opponent_slug = get_opponent_slug(opponent_clean)
+        if opponent_slug is None:
+            raise ValueError(f"STOP: unmapped DNP opponent '{opponent}' needs to be added to opponents.py.")
         match_key = f"{season_code}_{date_str[5:]}_{opponent_slug}_1"
 
         row = {
@@ -359,41 +329,63 @@ def merge_stats():
     master_df = master_df.drop_duplicates(subset="match_key", keep="first")
 
     # rename cols
-    rename_map = {
-        "kills_attacking": "kills",
-        "kills_per_set_attacking": "kills_per_set",
-        "kill_pct_attacking": "kill_pct",
-        "kill_att_attacking": "kill_attempts",
-        "kill_err_attacking": "kill_errors",
-        "hit_pct_attacking": "hit_pct",
-        "assists_ball_handling": "assists",
-        "assists_per_set_ball_handling": "assists_per_set",
-        "ball_handling_att_ball_handling": "ball_handling_attempts",
-        "ball_handling_err_ball_handling": "ball_handling_errors",
-        "solo_blks_blocking": "solo_blocks",
-        "assisted_blks_blocking": "assisted_blocks",
-        "total_blks_blocking": "total_blocks",
-        "blks_per_set_blocking": "blocks_per_set",
-        "blk_err_blocking": "block_errors",
-        "digs_digging": "digs",
-        "digs_per_set_digging": "digs_per_set",
-        "dig_err_digging": "dig_errors",
-        "receiving_serve_receiving": "receiving",
-        "receiving_err_serve_receiving": "receiving_errors",
-        "receiving_per_set_serve_receiving": "receiving_per_set",
-        "aces_serving": "aces",
-        "aces_per_set_serving": "aces_per_set",
-        "ace_pct_serving": "ace_pct",
-        "serve_att_serving": "serve_attempts",
-        "serve_err_serving": "serve_errors",
-        "serve_pct_serving": "serve_pct",
-        "points_serving": "points"
-    }
-    master_df = master_df.rename(columns=rename_map)
-
-    master_path = os.path.join(OUTPUT_DIR, "RENAMED_all_stats_merged.csv")
-    master_df.to_csv(master_path, index=False)
-    print(f"SAVED master file: {master_path}")
+    master_df = master_df.rename(columns=STAT_RENAME_MAP)
+    return master_df
+
+def ingest_season(season_folder, write=True):
+    # worker unit: raw categories -> merged season frame, written to its own season file
+    season_merged = merge_season(season_folder)
+    if season_merged is not None and write:
+        out_path = season_output_path(season_folder)
+        season_merged.to_csv(out_path, index=False)
+        print(f"Saved: {out_path}")
+    return season_merged
+
+def build_master_stats(seasons=None, workers=1, write_seasons=True):
+    # seasons: folders to re-merge from raw; the rest are loaded from their saved season files
+    # workers > 1 ingests those seasons in a process pool (seasons are independent until the concat)
+    # returns (master_df, {season_code: merged season frame}) without writing the master file
+    to_ingest = [f for f in SEASON_YEAR_MAP if seasons is None or f in seasons]
+    ingest = partial(ingest_season, write=write_seasons)
+
+    with step("ingest_seasons") as rec:
+        if workers and workers > 1 and len(to_ingest) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(to_ingest))) as pool:
+                ingested = dict(zip(to_ingest, pool.map(ingest, to_ingest)))
+        else:
+            ingested = {season_folder: ingest(season_folder) for season_folder in to_ingest}
+        rec.rows_out = sum(len(df) for df in ingested.values() if df is not None)
+
+    # combine in SEASON_YEAR_MAP order regardless of which worker finished first
+    season_frames = {}
+    for season_folder in SEASON_YEAR_MAP:
+        if season_folder in ingested:
+            season_merged = ingested[season_folder]
+        else:
+            season_merged = load_season(season_folder)
+
+        if season_merged is not None:
+            season_frames[SEASON_YEAR_MAP[season_folder][1]] = season_merged
+
+    all_seasons_merged = list(season_frames.values())
+    with step("combine_seasons", rows_in=sum(len(df) for df in all_seasons_merged)) as rec:
+        master_df = combine_seasons(all_seasons_merged)
+        rec.rows_out = len(master_df)
+    return master_df, season_frames
+
+def merge_stats(seasons=None, output_path=STATS_OUTPUT_PATH, workers=1):
+    master_df, _ = build_master_stats(seasons, workers)
+
+    with step("write", rows_in=len(master_df)):
+        master_df.to_csv(output_path, index=False)
+        write_typed(master_df, output_path)
+    print(f"SAVED master file: {output_path}")
+    return master_df
 
 if __name__ == "__main__":
-    merge_stats()
+    parser = argparse.ArgumentParser(description="Merge per-category season stats into one master stats file.")
+    parser.add_argument("--workers", type=int, default=1, help="process-pool size for per-season ingestion (default: 1, serial)")
+    args = parser.parse_args()
+
+    with run_report("merge_stats"):
+        merge_stats(workers=args.workers)
@@ -0,0 +1,54 @@
+"""
+@name streaks.py
+@created October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+def streaks(predicate, groups=None):
+    """
+    Run-length streaks of a boolean predicate (e.g. result == "W", kills >= 10),
+    resetting whenever the predicate is False and at every group boundary.
+
+    Returns a DataFrame aligned to `predicate` with:
+      current  - streak length ending at this row (0 when the predicate is False)
+      previous - streak length going into this row (0 on a group's first row)
+      longest  - longest streak seen so far in the group, this row included
+
+    Rows keep their order within each group; groups don't need to be contiguous.
+    Everything is cumulative NumPy ops, so it's linear after one stable sort.
+    """
+    pred = pd.Series(predicate)
+    index = pred.index
+    p = pred.fillna(False).to_numpy(dtype=bool)
+    n = len(p)
+
+    if groups is None:
+        codes = np.zeros(n, dtype=np.int64)
+    else:
+        codes = pd.factorize(pd.Series(groups), use_na_sentinel=False)[0].astype(np.int64)
+
+    order = np.argsort(codes, kind="mergesort")
+    p = p[order]
+    codes = codes[order]
+    idx = np.arange(n)
+
+    group_start = np.ones(n, dtype=bool)
+    group_start[1:] = codes[1:] != codes[:-1]
+
+    # last row at or before i that breaks a streak (a False, or the row just before a group starts)
+    breaks = np.where(~p, idx, np.where(group_start, idx - 1, -1))
+    current = idx - np.maximum.accumulate(breaks)
+
+    previous = np.zeros(n, dtype=np.int64)
+    previous[1:] = current[:-1]
+    previous[group_start] = 0
+
+    # groups are sorted ascending, so offsetting by group code keeps the running max inside each group
+    offset = codes * (n + 1)
+    longest = np.maximum.accumulate(current + offset) - offset
+
+    out = np.empty((n, 3), dtype=np.int64)
+    out[order] = np.column_stack([current, previous, longest])
+    return pd.DataFrame(out, index=index, columns=["current", "previous", "longest"])
@@ -0,0 +1,228 @@
+"""
+@name synthetic_data.py
+@created October 2026
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from opponents import OPPONENT_SLUGS
+from schedule_cleaning import sick_dates, injured_dates
+from stat_schema import STAT_SCHEMAS
+from stats_merge import SEASON_YEAR_MAP, STAT_CATEGORIES, JUNIOR_SCHEDULE_PATH
+
+SCHEDULE_COLUMNS = [
+    "date", "opponent", "result", "set_scores", "set_result", "set_count", "set_diff",
+    "location", "is_conference", "is_playoffs", "is_tournament", "maxpreps",
+]
+SEASON_START = "08-25"
+SEASON_END = "11-15"
+SEASON_CODES = {year: code for year, code in SEASON_YEAR_MAP.values()}
+WRITE_CHUNK = 500_000  # rows formatted and appended per write, so 10^7-match trees stay in bounded memory
+
+# the DNP placeholders stats_merge adds by hand: they have to exist in the schedule as the first match
+# of their date, and have no raw stat rows
+DNP_MATCHES = [
+    ("2016-09-24", "Connelly School of the Holy Child"),
+    ("2019-10-21", "McLean"),
+    ("2016-09-27", "McLean"),
+    ("2017-09-18", "Berman Hebrew Academy"),
+    ("2017-11-07", "Bell"),
+    ("2017-11-08", "Woodrow Wilson"),
+]
+
+# per-set Poisson rates, roughly the real career rates
+RATES = {
+    "kills": 2.4, "kill_miss": 4.0, "kill_err": 0.5,
+    "assists": 0.2, "ball_handling_miss": 3.0, "ball_handling_err": 0.1,
+    "solo_blks": 0.03, "assisted_blks": 0.03, "blk_err": 0.02,
+    "digs": 3.5, "dig_err": 0.5,
+    "receiving": 4.0, "receiving_err": 0.4,
+    "serve_att": 6.0, "rally_points": 3.0,
+}
+
+def season_dates(year, exclude):
+    dates = pd.date_range(f"{year}-{SEASON_START}", f"{year}-{SEASON_END}")
+    return dates[~dates.isin(exclude)]
+
+def simulate_sets(rng, n):
+    # best-of-5 or best-of-3; the winner takes the last set, the loser's sets land among the earlier ones
+    need = np.where(rng.random(n) < 0.5, 3, 2)
+    won = rng.random(n) < 0.6
+    loser_sets = (rng.random(n) * need).astype(int)
+    n_sets = need + loser_sets
+
+    slot = np.arange(5)[None, :]
+    keys = np.where(slot < (n_sets - 1)[:, None], rng.random((n, 5)), np.inf)
+    rank = np.argsort(np.argsort(keys, axis=1), axis=1)
+    loser_won = rank < loser_sets[:, None]
+    we_won = np.where(won[:, None], ~loser_won, loser_won) & (slot < n_sets[:, None])
+
+    to = np.where((slot == 4) & (need[:, None] == 3), 15, 25)
+    loser_pts = (rng.random((n, 5)) * (to - 8) + 3).astype(int) + np.where(to == 25, 5, 0)
+    loser_pts = np.minimum(loser_pts, to - 2)
+    ours = np.where(we_won, to, loser_pts)
+    theirs = np.where(we_won, loser_pts, to)
+
+    text = np.char.add(np.char.add(ours.astype(str), "-"), theirs.astype(str))
+    set_scores = text[:, 0]
+    for j in range(1, 5):
+        set_scores = np.where(j < n_sets, np.char.add(np.char.add(set_scores, ","), text[:, j]), set_scores)
+
+    sets_for = we_won.sum(axis=1)
+    sets_against = n_sets - sets_for
+    return pd.DataFrame({
+        "result": np.where(won, "W", "L"),
+        "set_scores": set_scores,
+        "set_result": pd.Series(sets_for).astype(str) + "-" + pd.Series(sets_against).astype(str),
+        "set_count": n_sets,
+        "set_diff": sets_for - sets_against,
+    })
+
+def season_schedule(rng, year, n_matches, opponents):
+    exclude = pd.to_datetime([d for d, _ in DNP_MATCHES] + list(sick_dates) + list(injured_dates))
+    dates = season_dates(year, exclude)
+    df = pd.DataFrame({
+        "date": np.sort(rng.choice(dates.to_numpy(), n_matches)),
+        "opponent": rng.choice(opponents, n_matches),
+        "dnp": False,
+    })
+    dnp = pd.DataFrame([(pd.Timestamp(d), o, True) for d, o in DNP_MATCHES if d.startswith(str(year))],
+                       columns=["date", "opponent", "dnp"])
+    df = pd.concat([dnp, df], ignore_index=True).sort_values(["date", "dnp"], ascending=[True, False], kind="mergesort")
+    df = df.reset_index(drop=True)
+    df["date"] = pd.to_datetime(df["date"])
+    df["dnp"] = df["dnp"].astype(bool)
+    df = pd.concat([df, simulate_sets(rng, len(df))], axis=1)
+
+    df["location"] = rng.choice(["home", "away", "neutral"], len(df))
+    df["is_conference"] = rng.random(len(df)) < 0.3
+    df["is_playoffs"] = False
+    df["is_tournament"] = rng.random(len(df)) < 0.2
+    df["maxpreps"] = ""
+
+    # same rules schedule_cleaning uses to build keys
+    season = SEASON_CODES[year]
+    df["match_no"] = df.groupby("date").cumcount() + 1
+    slugs = df["opponent"].map(OPPONENT_SLUGS).str.replace(r"\W+", "", regex=True)
+    df["match_key"] = season + "_" + df["date"].dt.strftime("%m-%d") + "_" + slugs + "_" + df["match_no"].astype(str)
+    return df
+
+def stat_lines(rng, sets):
+    # one row of raw counts per match, internally consistent (kills <= attempts, aces <= serves, ...)
+    s = sets.astype(float)
+    p = {k: rng.poisson(rate * s) for k, rate in RATES.items()}
+    kill_att = p["kills"] + p["kill_miss"] + 1
+    kill_err = np.minimum(p["kill_err"], kill_att - p["kills"])
+    serve_att = p["serve_att"] + 1
+    aces = rng.binomial(serve_att, 0.2)
+    serve_err = rng.binomial(serve_att - aces, 0.08)
+    total_blks = p["solo_blks"] + p["assisted_blks"]
+    return {
+        "attacking": {
+            "kills": p["kills"], "kills_per_set": np.round(p["kills"] / s, 2),
+            "kill_pct": np.round(100 * p["kills"] / kill_att, 1), "kill_att": kill_att,
+            "kill_err": kill_err, "hit_pct": np.round((p["kills"] - kill_err) / kill_att, 3),
+        },
+        "ball_handling": {
+            "assists": p["assists"], "assists_per_set": np.round(p["assists"] / s, 2),
+            "ball_handling_att": p["assists"] + p["ball_handling_miss"], "ball_handling_err": p["ball_handling_err"],
+        },
+        "blocking": {
+            "solo_blks": p["solo_blks"], "assisted_blks": p["assisted_blks"], "total_blks": total_blks,
+            "blks_per_set": np.round(total_blks / s, 2), "blk_err": p["blk_err"],
+        },
+        "digging": {"digs": p["digs"], "dig_err": p["dig_err"], "digs_per_set": np.round(p["digs"] / s, 2)},
+        "serve_receiving": {
+            "receiving": p["receiving"], "receiving_err": p["receiving_err"],
+            "receiving_per_set": np.round(p["receiving"] / s, 2),
+        },
+        "serving": {
+            "aces": aces, "aces_per_set": np.round(aces / s, 2), "ace_pct": np.round(100 * aces / serve_att, 1),
+            "serve_att": serve_att, "serve_err": serve_err,
+            "serve_pct": np.round(100 * (serve_att - serve_err) / serve_att, 1), "points": aces + p["rally_points"],
+        },
+    }
+
+def append_csv(df, path, first):
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+def write_season(rng, root, folder, year, schedule, schedule_path, first_schedule_chunk):
+    raw_dir = os.path.join(root, "data/raw", folder)
+    os.makedirs(raw_dir, exist_ok=True)
+    season = SEASON_CODES[year]
+    junior_path = os.path.join(root, JUNIOR_SCHEDULE_PATH)
+    totals = {}
+
+    for start in range(0, len(schedule), WRITE_CHUNK):
+        chunk = schedule.iloc[start:start + WRITE_CHUNK]
+        first = start == 0
+        out = chunk[SCHEDULE_COLUMNS].copy()
+        out["date"] = chunk["date"].dt.strftime("%m/%d/%Y")
+        append_csv(out, schedule_path, first_schedule_chunk and first)
+
+        if season == "JR":
+            # JR has a season schedule but no per-match stat exports
+            jr = out.rename(columns={"location": "h_a_n"})
+            jr["date"] = chunk["date"].dt.strftime("%m/%d")
+            append_csv(jr, junior_path, first)
+            lines = stat_lines(rng, chunk.loc[~chunk["dnp"], "set_count"].to_numpy())
+            for stat in ["kills", "digs", "aces", "total_blks"]:
+                category = next(c for c, cols in lines.items() if stat in cols)
+                totals[stat] = totals.get(stat, 0) + int(lines[category][stat].sum())
+            continue
+
+        played = chunk[~chunk["dnp"]]
+        meta = pd.DataFrame({
+            "match_key": played["match_key"].to_numpy(),
+            "date": played["date"].dt.strftime("%m/%d").to_numpy(),
+            "result": (played["result"] + " " + played["set_result"]).to_numpy(),
+            "opponent": played["opponent"].to_numpy(),
+            "sets_played": played["set_count"].to_numpy(),
+        })
+        lines = stat_lines(rng, played["set_count"].to_numpy())
+        # one file per category the loader reads, so the tree can't drift from stats_merge
+        for category in STAT_CATEGORIES:
+            frame = pd.concat([meta, pd.DataFrame(lines[category])[list(STAT_SCHEMAS[category])]], axis=1)
+            append_csv(frame, os.path.join(raw_dir, f"{category}.csv"), first)
+
+    if season == "JR":
+        general = pd.DataFrame([{
+            "kills": totals.get("kills", 0), "kill_pct": 0.2, "tot_blks": totals.get("total_blks", 0),
+            "digs": totals.get("digs", 0), "aces": totals.get("aces", 0),
+        }])
+        general.to_csv(os.path.join(raw_dir, "general.csv"), index=False)
+
+def generate_tree(root, n_matches, seed=0):
+    """
+    Write a synthetic data/ tree under `root` shaped exactly like the real one:
+    master_schedule.csv, the JR season schedule, raw category CSVs for
+    FR/SO/SR and the JR totals sheet, all sharing match_keys. `n_matches` is
+    split evenly across the four seasons (the six DNP placeholders are added
+    on top). Same seed, same tree.
+    """
+    rng = np.random.default_rng(seed)
+    opponents = np.array(sorted(OPPONENT_SLUGS))
+
+    schedule_path = os.path.join(root, "data/schedules/master_schedule.csv")
+    for d in ["data/schedules/season", "data/cleaned"]:
+        os.makedirs(os.path.join(root, d), exist_ok=True)
+
+    per_season = np.full(len(SEASON_YEAR_MAP), n_matches // len(SEASON_YEAR_MAP))
+    per_season[: n_matches % len(SEASON_YEAR_MAP)] += 1
+    for i, ((folder, (year, _)), n) in enumerate(zip(SEASON_YEAR_MAP.items(), per_season)):
+        schedule = season_schedule(rng, year, int(n), opponents)
+        write_season(rng, root, folder, year, schedule, schedule_path, first_schedule_chunk=(i == 0))
+    return root
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic data/ tree for benchmarking.")
+    parser.add_argument("root", help="directory to write data/ under")
+    parser.add_argument("--matches", type=int, default=1_000, help="total matches across the four seasons")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_tree(args.root, args.matches, args.seed)
+    print(f"✅ Wrote {args.matches} synthetic matches under '{args.root}'")
@@ -0,0 +1,54 @@
+"""
+@name time_windows.py
+@created October 2026
+"""
+
+import numpy as np
+import pandas as pd
+
+WORKLOAD_WINDOWS = [3, 7, 28]
+
+def rolling_window_sum(dates, window_days, groups=None, weights=None):
+    """
+    For every row, sum `weights` (default 1 -> match count) over rows in the
+    same group whose date falls in [date - (window_days - 1), date].
+
+    Rows are sorted once by (group, day) and window edges are found with
+    searchsorted, so this is O(n log n) however many rows or groups there are.
+    Results come back in the original row order.
+    """
+    days = pd.to_datetime(pd.Series(dates)).to_numpy().astype("datetime64[D]").astype(np.int64)
+    n = len(days)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if groups is None:
+        codes = np.zeros(n, dtype=np.int64)
+    else:
+        codes = pd.factorize(pd.Series(groups), use_na_sentinel=False)[0].astype(np.int64)
+
+    if weights is None:
+        values = np.ones(n, dtype=np.int64)
+    else:
+        values = pd.to_numeric(pd.Series(weights), errors="coerce").fillna(0).to_numpy()
+
+    # pack (group, day) into one sortable key; the gap between groups is wider than any window
+    span = days.max() - days.min() + window_days + 1
+    keys = codes * span + (days - days.min())
+
+    order = np.argsort(keys, kind="mergesort")
+    sorted_keys = keys[order]
+    csum = np.concatenate(([0], np.cumsum(values[order])))
+
+    left = np.searchsorted(sorted_keys, sorted_keys - (window_days - 1), side="left")
+    right = np.searchsorted(sorted_keys, sorted_keys, side="right")
+
+    out = np.empty_like(csum[1:])
+    out[order] = csum[right] - csum[left]
+    return out
+
+def add_workload_windows(df, date_col="date", group_col="season", sets_col="set_count", windows=WORKLOAD_WINDOWS):
+    for w in windows:
+        df[f"match_density_{w}days"] = rolling_window_sum(df[date_col], w, groups=df[group_col])
+        df[f"set_density_{w}days"] = rolling_window_sum(df[date_col], w, groups=df[group_col], weights=df[sets_col])
+    return df
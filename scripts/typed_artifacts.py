@@ -0,0 +1,100 @@
+"""
+@name typed_artifacts.py
+@created October 2026
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+SEASON_DTYPE = pd.CategoricalDtype(categories=["FR", "SO", "JR", "SR"], ordered=True)
+STAGE_DTYPE = pd.CategoricalDtype(categories=["early", "mid", "late"], ordered=True)
+
+CATEGORICAL_COLUMNS = {
+    "season": SEASON_DTYPE,
+    "career_stage": STAGE_DTYPE,
+    "season_stage": STAGE_DTYPE,
+    "opponent_slug": "category",
+    "match_type": "category",
+    "game_importance": "category",
+    "day_of_week": "category",
+    "location": "category",
+}
+INT_COLUMNS = ["career_match_index", "season_match_number", "match_no", "set_count", "set_diff", "sets_played"]
+DATE_COLUMNS = ["date"]
+
+def typed_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".feather"
+
+def _as_bool(series):
+    # CSV round trips leave flags as object/str columns; keep NA-able ones as nullable booleans
+    values = series.dropna()
+    if values.empty or not values.isin([True, False, "True", "False"]).all():
+        return series
+    flags = series.map({True: True, False: False, "True": True, "False": False})
+    return flags.astype(bool) if flags.notna().all() else flags.astype("boolean")
+
+def apply_types(df):
+    df = df.copy()
+    for col, dtype in CATEGORICAL_COLUMNS.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    for col in INT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            # one unit whether the column arrives parsed or as CSV text
+            df[col] = pd.to_datetime(df[col], errors="coerce").astype("datetime64[ns]")
+    for col in df.columns:
+        if df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype):
+            df[col] = _as_bool(df[col])
+    return df
+
+def read_stage_csv(path):
+    # exact float round trip (the default parser can land an ulp off), so a stage reading another
+    # stage's CSV sees the same values the in-memory run hands over
+    return pd.read_csv(path, float_precision="round_trip")
+
+def as_csv_types(df):
+    """
+    The dtypes a CSV round trip would leave: nullable ints/floats become
+    int64 (no NA) or float64, NA-free nullable booleans become bool, object
+    columns holding only numbers become numeric and empty strings become NaN. The in-memory
+    pipeline passes frames through this at each handoff so it computes and
+    writes exactly what the staged run does.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_string_dtype(dtype) or dtype == object:
+            kind = pd.api.types.infer_dtype(series, skipna=True)
+            if kind not in ("integer", "floating", "mixed-integer-float"):
+                if kind in ("string", "empty"):
+                    # empty fields read back as NaN, text as the reader's default string dtype
+                    text = series.astype(object)
+                    df[col] = text.where(series.notna() & ~text.eq(""), np.nan).infer_objects()
+                continue
+            series = pd.to_numeric(series)
+            dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            df[col] = series.astype(bool) if series.notna().all() else series
+        elif pd.api.types.is_integer_dtype(dtype):
+            df[col] = series.astype("int64") if series.notna().all() else series.astype("float64")
+        elif pd.api.types.is_float_dtype(dtype):
+            df[col] = series.astype("float64")
+    return df
+
+def write_typed(df, csv_path):
+    # uncompressed Arrow IPC (Feather v2) so readers can memory-map it
+    path = typed_path(csv_path)
+    apply_types(df).reset_index(drop=True).to_feather(path, compression="uncompressed")
+    return path
+
+def read_typed(path):
+    from pyarrow import feather
+    return feather.read_table(path, memory_map=True).to_pandas()
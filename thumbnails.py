@@ -0,0 +1,76 @@
+"""
+Resized WebP copies of the app's photos
+@created October 2026
+"""
+
+import os
+
+from scripts.hashing import file_hash
+
+IMAGE_DIR = "images"
+THUMB_DIR = "data/.cache/thumbnails"
+WIDTHS = [640, 960]
+WEBP_QUALITY = 80
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+def thumbnail_path(digest, width, thumb_dir=THUMB_DIR):
+    # keyed by content, so a replaced photo gets new thumbnails and renames cost nothing
+    return os.path.join(thumb_dir, f"{digest[:16]}_{width}.webp")
+
+def build_thumbnail(path, width, thumb_dir=THUMB_DIR, digest=None):
+    out_path = thumbnail_path(digest or file_hash(path), width, thumb_dir)
+    if os.path.exists(out_path):
+        return out_path
+
+    from PIL import Image, ImageOps
+
+    os.makedirs(thumb_dir, exist_ok=True)
+    with Image.open(path) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")  # phone photos carry their rotation in EXIF
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        tmp = f"{out_path}.{os.getpid()}.tmp"
+        img.save(tmp, "WEBP", quality=WEBP_QUALITY, method=6)
+    os.replace(tmp, out_path)
+    return out_path
+
+def build_thumbnails(paths, widths=WIDTHS, thumb_dir=THUMB_DIR):
+    """
+    Build (or reuse) a WebP thumbnail at every width for each source image.
+
+    Returns {source path: {width: thumbnail path}}. Missing sources are
+    skipped; if Pillow isn't installed nothing is built and the map is empty,
+    so callers fall back to the originals.
+    """
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("WARNING: Pillow not installed; serving full-size images.")
+        return {}
+
+    built = {}
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Missing: {path}")
+            continue
+        digest = file_hash(path)
+        built[path] = {width: build_thumbnail(path, width, thumb_dir, digest) for width in widths}
+    return built
+
+def pick_image(thumbs, path, width):
+    # smallest thumbnail at least `width` wide, else the largest one, else the original
+    sizes = thumbs.get(path)
+    if not sizes:
+        return path
+    wide_enough = [w for w in sorted(sizes) if w >= width]
+    return sizes[wide_enough[0] if wide_enough else max(sizes)]
+
+def image_paths(image_dir=IMAGE_DIR):
+    return sorted(
+        os.path.join(image_dir, name) for name in os.listdir(image_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+if __name__ == "__main__":
+    thumbs = build_thumbnails(image_paths())
+    print(f"✅ Thumbnails ready for {len(thumbs)} image(s) in '{THUMB_DIR}'")